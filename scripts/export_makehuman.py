@@ -16,10 +16,26 @@ import bpy
 import bmesh
 import os
 import gzip
+import re
+import functools
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
 OUTPUT_PATH = os.path.join(PROJECT_DIR, "assets", "models", "makehuman_base.glb")
+SYSTEM_ASSET_DIR = os.path.join(PROJECT_DIR, "assets", "system")
+CLOTHING_ASSET_DIR = os.path.join(PROJECT_DIR, "assets", "clothing")
+CLOTHING_OUTPUT_DIR = os.path.join(PROJECT_DIR, "assets", "models", "clothing")
+
+# Parsed .target files from the last run, reused while the files are unchanged
+TARGET_CACHE_PATH = os.path.join(PROJECT_DIR, ".cache", "targets_cache.npz")
+
+# Background Blender processes used to export Mixamo clips in parallel.
+# Each loads the full body scene, so leave headroom for memory.
+ANIMATION_WORKERS = max(1, (os.cpu_count() or 2) // 2)
 
 # Curated targets — mobile-friendly subset (no ethnicity macros)
 CURATED_TARGETS = [
@@ -159,53 +175,219 @@ def find_target_dir():
     return None
 
 
+@functools.lru_cache(maxsize=None)
+def _target_index(target_dir):
+    """Map every target spec under target_dir ("head/head-oval") to its file.
+
+    Built from one os.walk of the directory, so resolving ~200 specs costs
+    no per-file stat() calls. .target.gz wins over .target.
+    """
+    index = {}
+    for root, _dirs, files in os.walk(target_dir):
+        rel_dir = os.path.relpath(root, target_dir).replace(os.sep, "/")
+        for fname in files:
+            for ext in [".target.gz", ".target"]:
+                if fname.endswith(ext):
+                    stem = fname[:-len(ext)]
+                    spec = stem if rel_dir == "." else f"{rel_dir}/{stem}"
+                    if ext == ".target.gz" or spec not in index:
+                        index[spec] = os.path.join(target_dir, spec + ext)
+                    break
+    return index
+
+
 def resolve_target_path(target_dir, target_spec):
-    for ext in [".target.gz", ".target"]:
-        path = os.path.join(target_dir, target_spec + ext)
-        if os.path.isfile(path):
-            return path
-    return None
+    return _target_index(target_dir).get(target_spec)
 
 
-def build_vertex_index_map(basemesh, delete_verts=None):
-    """Build a mapping from original (full mesh) vertex indices to
-    body-only vertex indices. Uses the 'body' vertex group.
-    Optionally excludes delete_verts (body vertices hidden by clothing)."""
-    vg = basemesh.vertex_groups.get("body")
-    if not vg:
-        print("WARNING: No 'body' vertex group found, using all vertices")
-        return {i: i for i in range(len(basemesh.data.vertices))}
-
-    if delete_verts is None:
-        delete_verts = set()
-
-    vg_idx = vg.index
-    old_to_new = {}
-    new_idx = 0
-    deleted_count = 0
-    for v in basemesh.data.vertices:
-        in_body = False
-        for g in v.groups:
-            if g.group == vg_idx and g.weight > 0.5:
-                in_body = True
-                break
-        if in_body:
-            if v.index in delete_verts:
-                deleted_count += 1
-            else:
-                old_to_new[v.index] = new_idx
-                new_idx += 1
+# Arrays loaded from TARGET_CACHE_PATH, handed out once by parse_target
+_cached_targets = {}
+
+
+@functools.lru_cache(maxsize=None)
+def parse_target(target_path):
+    """Parse a .target(.gz) file into (indices, offsets) arrays.
+
+    indices is int32 (N,) of original MPFB2 vertex indices, offsets float32
+    (N, 3). The file is decompressed in one gzip.decompress() call, comment
+    lines are blanked with one regex, and np.fromstring parses the remaining
+    whitespace-separated numbers in C, with no per-line Python objects.
+    Files with rows that are not exactly 4 numbers go through a per-line
+    parse: short lines are skipped, extra tokens ignored, and non-numeric
+    values raise ValueError.
+
+    Results are cached by path: the clothing morph pass and the body shape-key
+    pass read the same files, so each is decompressed and parsed only once.
+    The arrays are shared between callers and therefore read-only.
+    """
+    cached = _cached_targets.pop(target_path, None)
+    if cached is not None:
+        return cached
+    with open(target_path, "rb") as f:
+        raw = f.read()
+    if target_path.endswith(".gz"):
+        raw = gzip.decompress(raw)
+    text = re.sub(rb"#[^\n]*", b"", raw).strip()
+    try:
+        values = np.fromstring(text, dtype=np.float32, sep=" ") if text else np.empty(0, dtype=np.float32)
+    except ValueError:
+        values = None
+    # np.fromstring stops at a bad token and returns what it has so far, so
+    # the count must match 4 numbers per data line
+    rows = len(re.findall(rb"(?m)^[ \t\r]*\S", text))
+    if values is not None and values.size == rows * 4:
+        data = values.reshape(-1, 4)
+    else:
+        # Lines with fewer than 4 tokens are skipped, extra tokens ignored
+        tokens = [line.split()[:4] for line in text.splitlines()]
+        data = np.array([[float(t) for t in row] for row in tokens if len(row) == 4],
+                        dtype=np.float32).reshape(-1, 4)
+    indices, offsets = data[:, 0].astype(np.int32), data[:, 1:4]
+    indices.setflags(write=False)
+    offsets.setflags(write=False)
+    return indices, offsets
+
+
+def _load_target_cache(paths, stamp):
+    """Fill _cached_targets from TARGET_CACHE_PATH if it was saved for stamp.
+
+    The cache packs every target into one indices and one offsets array
+    plus a per-target row count; each target's arrays are views into them.
+    """
+    if not os.path.isfile(TARGET_CACHE_PATH):
+        return False
+    try:
+        with np.load(TARGET_CACHE_PATH) as data:
+            if str(data["stamp"]) != stamp:
+                return False
+            all_indices, all_offsets, counts = data["indices"], data["offsets"], data["counts"]
+        if len(counts) != len(paths):
+            return False
+        all_indices.setflags(write=False)
+        all_offsets.setflags(write=False)
+        splits = np.cumsum(counts)[:-1]
+        for path, indices, offsets in zip(paths, np.split(all_indices, splits), np.split(all_offsets, splits)):
+            _cached_targets[path] = (indices, offsets)
+    except Exception as e:
+        print(f"  WARNING: Ignoring target cache: {e}")
+        _cached_targets.clear()
+        return False
+    return True
+
+
+def _save_target_cache(paths, stamp):
+    parsed = [parse_target(path) for path in paths]
+    try:
+        os.makedirs(os.path.dirname(TARGET_CACHE_PATH), exist_ok=True)
+        np.savez(
+            TARGET_CACHE_PATH,
+            stamp=np.array(stamp),
+            counts=np.array([len(indices) for indices, _ in parsed], dtype=np.int64),
+            indices=np.concatenate([indices for indices, _ in parsed] or [np.empty(0, np.int32)]),
+            offsets=np.concatenate([offsets for _, offsets in parsed] or [np.empty((0, 3), np.float32)]),
+        )
+    except OSError as e:
+        print(f"  WARNING: Could not write target cache: {e}")
+
+
+def prefetch_targets(target_dir):
+    """Parse every curated and symmetric target into the parse_target cache.
+
+    Parsed arrays are saved to TARGET_CACHE_PATH, keyed by each file's path,
+    size and mtime; later runs with unchanged files load that one .npz and
+    skip decompression entirely.
+
+    Otherwise the files are parsed by a thread pool: they are independent
+    and zlib releases the GIL while decompressing, so reads and parses
+    overlap. Only the parse runs off the main thread; shape keys are still
+    created serially by the loaders, since Blender data is not thread-safe.
+    """
+    specs = list(CURATED_TARGETS)
+    for _sk_name, r_spec, l_spec in SYMMETRIC_TARGETS:
+        specs.extend((r_spec, l_spec))
+    paths = {resolve_target_path(target_dir, spec) for spec in specs}
+    paths.discard(None)
+    paths = sorted(paths)
+
+    stats = [os.stat(path) for path in paths]
+    stamp = "\n".join(f"{path}:{st.st_size}:{st.st_mtime_ns}" for path, st in zip(paths, stats))
+    if _load_target_cache(paths, stamp):
+        print(f"  Loaded {len(paths)} parsed targets from {TARGET_CACHE_PATH}")
+        return
+
+    def try_parse(path):
+        try:
+            parse_target(path)
+            return None
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as pool:
+        errors = list(pool.map(try_parse, paths))
+    # A bad file is left to the loaders, which report it per target
+    failed = [(path, e) for path, e in zip(paths, errors) if e is not None]
+    for path, e in failed:
+        print(f"  WARNING: Could not parse {os.path.basename(path)}: {e}")
+    print(f"  Parsed {len(paths) - len(failed)} target files")
+    if not failed:
+        _save_target_cache(paths, stamp)
+
+
+def read_vertex_co(mesh):
+    """Return mesh vertex coordinates as a float32 (V, 3) array (one foreach_get)."""
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    return co.reshape(-1, 3)
+
+
+def add_offset_shape_key(obj, sk_name, base_co, indices, offsets):
+    """Add shape key sk_name whose positions are base_co plus offsets at indices.
+
+    base_co is (V, 3) from read_vertex_co(); indices/offsets may be arrays or
+    an offsets dict's keys()/values(). All positions are written with a single
+    foreach_set.
+    """
+    co = base_co.copy()
+    if len(indices):
+        co[np.asarray(indices, dtype=np.int64)] += np.asarray(offsets, dtype=np.float32).reshape(-1, 3)
+    sk = obj.shape_key_add(name=sk_name, from_mix=False)
+    sk.data.foreach_set("co", co.ravel())
+    return sk
+
 
-    print(f"  Vertex map: {len(old_to_new)} body vertices out of {len(basemesh.data.vertices)} total")
-    if deleted_count > 0:
-        print(f"  Excluded {deleted_count} vertices covered by clothing (delete_verts)")
-    return old_to_new
+def _bmesh_group_weights(bm, vg_idx):
+    """Every bmesh vertex's weight in vertex group vg_idx as float32 (0 if absent)."""
+    deform = bm.verts.layers.deform.active
+    weights = np.zeros(len(bm.verts), dtype=np.float32)
+    if deform is not None:
+        weights[:] = [v[deform].get(vg_idx, 0.0) for v in bm.verts]
+    return weights
 
 
-def remove_helper_geometry(basemesh, delete_verts=None):
-    """Remove non-body vertices AND clothing-covered vertices using bmesh.
+def read_group_weights(mesh, vg_idx):
+    """Return every vertex's weight in vertex group vg_idx as a float32 array.
+
+    Read in one pass over a bmesh deform layer; vertices outside the group
+    get 0.
+    """
+    bm = bmesh.new()
+    bm.from_mesh(mesh)
+    weights = _bmesh_group_weights(bm, vg_idx)
+    bm.free()
+    return weights
+
+
+def remove_helpers_and_build_lut(basemesh, delete_verts=None):
+    """Remove non-body vertices AND clothing-covered vertices, returning the
+    vertex lookup table for the vertices that remain.
     Must be called BEFORE any shape keys are added.
-    delete_verts: set of original vertex indices to also remove (body faces under clothing)."""
+    delete_verts: set of original vertex indices to also remove (body faces under clothing).
+
+    Body membership is read from the 'body' vertex group once, in the same
+    bmesh that performs the deletion, so the LUT always matches the mesh.
+    Returns an int32 array with one entry per original vertex: its body-only
+    index, or -1 if the vertex was removed.
+    """
     bpy.context.view_layer.objects.active = basemesh
     basemesh.select_set(True)
 
@@ -214,33 +396,32 @@ def remove_helper_geometry(basemesh, delete_verts=None):
         basemesh.modifiers.remove(m)
     print("  Removed all modifiers")
 
+    num_orig = len(basemesh.data.vertices)
     vg = basemesh.vertex_groups.get("body")
     if not vg:
-        print("WARNING: No 'body' vertex group, skipping helper removal")
-        return
-
-    if delete_verts is None:
-        delete_verts = set()
-
-    vg_idx = vg.index
+        print("WARNING: No 'body' vertex group found, using all vertices and skipping helper removal")
+        return np.arange(num_orig, dtype=np.int32)
 
     # Use bmesh for reliable vertex deletion in background mode
     bm = bmesh.new()
     bm.from_mesh(basemesh.data)
-    bm.verts.ensure_lookup_table()
 
-    deform_layer = bm.verts.layers.deform.active
-    to_remove = []
-    clothing_removed = 0
-    for v in bm.verts:
-        dvert = v[deform_layer]
-        is_body = vg_idx in dvert and dvert[vg_idx] >= 0.5
-        if not is_body:
-            to_remove.append(v)
-        elif v.index in delete_verts:
-            to_remove.append(v)
-            clothing_removed += 1
+    in_body = _bmesh_group_weights(bm, vg.index) >= 0.5
+    covered = np.zeros(num_orig, dtype=bool)
+    if delete_verts:
+        dv = np.fromiter(delete_verts, dtype=np.int64, count=len(delete_verts))
+        covered[dv[(dv >= 0) & (dv < num_orig)]] = True
+    keep = in_body & ~covered
+    kept = np.flatnonzero(keep)
+    clothing_removed = int(np.count_nonzero(in_body & covered))
 
+    vertex_lut = np.full(num_orig, -1, dtype=np.int32)
+    vertex_lut[kept] = np.arange(len(kept), dtype=np.int32)
+    print(f"  Vertex map: {len(kept)} body vertices out of {num_orig} total")
+
+    bm.verts.ensure_lookup_table()
+    bm_verts = bm.verts
+    to_remove = [bm_verts[i] for i in np.flatnonzero(~keep).tolist()]
     print(f"  Removing {len(to_remove)} vertices ({clothing_removed} clothing-covered body verts)...")
     bmesh.ops.delete(bm, geom=to_remove, context='VERTS')
     bm.to_mesh(basemesh.data)
@@ -248,9 +429,25 @@ def remove_helper_geometry(basemesh, delete_verts=None):
     basemesh.data.update()
 
     print(f"  After removing helpers: {len(basemesh.data.vertices)} vertices, {len(basemesh.data.polygons)} faces")
+    return vertex_lut
+
+
+def remap_vertex_indices(vertex_lut, indices, num_verts):
+    """Map original vertex indices through vertex_lut.
+
+    Returns (new_indices, keep): the body-only indices of the entries that
+    map inside a mesh of num_verts vertices, and a bool mask over the input
+    selecting those entries.
+    """
+    indices = np.asarray(indices, dtype=np.int64)
+    new_idx = np.full(len(indices), -1, dtype=np.int32)
+    in_range = (indices >= 0) & (indices < len(vertex_lut))
+    new_idx[in_range] = vertex_lut[indices[in_range]]
+    keep = (new_idx >= 0) & (new_idx < num_verts)
+    return new_idx[keep], keep
 
 
-def load_target_with_remap(basemesh, target_path, sk_name, old_to_new):
+def load_target_with_remap(basemesh, target_path, sk_name, vertex_lut):
     """Load a .target(.gz) file and add as a shape key, remapping vertex
     indices from the original full mesh to the body-only mesh."""
     mesh = basemesh.data
@@ -259,36 +456,14 @@ def load_target_with_remap(basemesh, target_path, sk_name, old_to_new):
     if not mesh.shape_keys:
         basemesh.shape_key_add(name="Basis", from_mix=False)
 
-    opener = gzip.open if target_path.endswith(".gz") else open
-    with opener(target_path, "rt") as f:
-        lines = f.readlines()
+    indices, deltas = parse_target(target_path)
+    new_idx, keep = remap_vertex_indices(vertex_lut, indices, num_verts)
+    add_offset_shape_key(basemesh, sk_name, read_vertex_co(mesh), new_idx, deltas[keep])
 
-    offsets = {}
-    skipped = 0
-    for line in lines:
-        line = line.strip()
-        if not line or line.startswith("#"):
-            continue
-        parts = line.split()
-        if len(parts) >= 4:
-            old_idx = int(parts[0])
-            new_idx = old_to_new.get(old_idx)
-            if new_idx is not None and new_idx < num_verts:
-                offsets[new_idx] = (float(parts[1]), float(parts[2]), float(parts[3]))
-            else:
-                skipped += 1
-
-    sk = basemesh.shape_key_add(name=sk_name, from_mix=False)
-    for idx, (dx, dy, dz) in offsets.items():
-        base = mesh.vertices[idx].co
-        sk.data[idx].co.x = base.x + dx
-        sk.data[idx].co.y = base.y + dy
-        sk.data[idx].co.z = base.z + dz
+    return len(new_idx)
 
-    return len(offsets)
 
-
-def load_symmetric_targets(basemesh, target_dir, old_to_new):
+def load_symmetric_targets(basemesh, target_dir, vertex_lut):
     """Load SYMMETRIC_TARGETS: merge r- and l- variants into single shape keys."""
     mesh = basemesh.data
     num_verts = len(mesh.vertices)
@@ -296,38 +471,26 @@ def load_symmetric_targets(basemesh, target_dir, old_to_new):
     if not mesh.shape_keys:
         basemesh.shape_key_add(name="Basis", from_mix=False)
 
+    base_co = read_vertex_co(mesh)
     loaded = 0
     for sk_name, r_spec, l_spec in SYMMETRIC_TARGETS:
-        r_offsets = load_target_offsets(target_dir, r_spec, old_to_new, num_verts)
-        l_offsets = load_target_offsets(target_dir, l_spec, old_to_new, num_verts)
+        r_idx, r_offsets = load_target_offsets(target_dir, r_spec, vertex_lut, num_verts)
+        l_idx, l_offsets = load_target_offsets(target_dir, l_spec, vertex_lut, num_verts)
 
-        if not r_offsets and not l_offsets:
+        if not len(r_idx) and not len(l_idx):
             print(f"  MISSING both sides: {sk_name}")
             continue
 
-        # Merge: combine offsets from both sides
-        merged = {}
-        for idx, (dx, dy, dz) in r_offsets.items():
-            merged[idx] = (dx, dy, dz)
-        for idx, (dx, dy, dz) in l_offsets.items():
-            if idx in merged:
-                # Both sides affect same vertex — add offsets
-                ox, oy, oz = merged[idx]
-                merged[idx] = (ox + dx, oy + dy, oz + dz)
-            else:
-                merged[idx] = (dx, dy, dz)
-
-        sk = basemesh.shape_key_add(name=sk_name, from_mix=False)
-        for idx, (dx, dy, dz) in merged.items():
-            base = mesh.vertices[idx].co
-            sk.data[idx].co.x = base.x + dx
-            sk.data[idx].co.y = base.y + dy
-            sk.data[idx].co.z = base.z + dz
+        # Merge: sum offsets from both sides (vertices both sides affect add up)
+        merged = np.zeros((num_verts, 3), dtype=np.float32)
+        np.add.at(merged, r_idx, r_offsets)
+        np.add.at(merged, l_idx, l_offsets)
+        touched = np.union1d(r_idx, l_idx)
+
+        sk = add_offset_shape_key(basemesh, sk_name, base_co, touched, merged[touched])
         sk.value = 0.0
 
-        r_count = len(r_offsets)
-        l_count = len(l_offsets)
-        print(f"  {sk_name}: {len(merged)} vertices (R:{r_count} + L:{l_count})")
+        print(f"  {sk_name}: {len(touched)} vertices (R:{len(r_idx)} + L:{len(l_idx)})")
         loaded += 1
 
     return loaded
@@ -350,175 +513,165 @@ def add_basic_material(basemesh):
     print("  Added skin material")
 
 
-def load_target_offsets(target_dir, target_spec, old_to_new, num_verts):
-    """Load a .target(.gz) file and return remapped offsets dict without creating a shape key."""
+def load_target_offsets(target_dir, target_spec, vertex_lut, num_verts):
+    """Load a .target(.gz) file and return remapped (indices, offsets) arrays
+    without creating a shape key. Both are empty if the target is missing."""
     target_path = resolve_target_path(target_dir, target_spec)
     if not target_path:
         print(f"  MISSING for composite: {target_spec}")
-        return {}
-
-    opener = gzip.open if target_path.endswith(".gz") else open
-    with opener(target_path, "rt") as f:
-        lines = f.readlines()
-
-    offsets = {}
-    for line in lines:
-        line = line.strip()
-        if not line or line.startswith("#"):
-            continue
-        parts = line.split()
-        if len(parts) >= 4:
-            old_idx = int(parts[0])
-            new_idx = old_to_new.get(old_idx)
-            if new_idx is not None and new_idx < num_verts:
-                offsets[new_idx] = (float(parts[1]), float(parts[2]), float(parts[3]))
+        return np.empty(0, dtype=np.int32), np.empty((0, 3), dtype=np.float32)
 
-    return offsets
+    indices, deltas = parse_target(target_path)
+    new_idx, keep = remap_vertex_indices(vertex_lut, indices, num_verts)
+    return new_idx, deltas[keep]
 
 
 def load_raw_target_offsets(target_dir, target_spec):
-    """Load a .target(.gz) file and return offsets using ORIGINAL vertex indices (no remapping).
+    """Load a .target(.gz) file as (indices, offsets) arrays using ORIGINAL vertex
+    indices (no remapping); empty arrays if the target is missing.
     Used for clothing morph transfer where .mhclo mappings reference original indices."""
     target_path = resolve_target_path(target_dir, target_spec)
     if not target_path:
-        return {}
-
-    opener = gzip.open if target_path.endswith(".gz") else open
-    with opener(target_path, "rt") as f:
-        lines = f.readlines()
-
-    offsets = {}
-    for line in lines:
-        line = line.strip()
-        if not line or line.startswith("#"):
-            continue
-        parts = line.split()
-        if len(parts) >= 4:
-            idx = int(parts[0])
-            offsets[idx] = (float(parts[1]), float(parts[2]), float(parts[3]))
-
-    return offsets
+        return np.empty(0, dtype=np.int32), np.empty((0, 3), dtype=np.float32)
+    return parse_target(target_path)
 
 
 def collect_all_morph_deltas(target_dir, breast_deltas):
     """Collect all morph target deltas using ORIGINAL vertex indices.
 
-    Returns dict[morph_name, dict[vertex_idx, (dx, dy, dz)]].
+    Returns dict[morph_name, (indices, offsets)] with int32 (N,) indices and
+    float32 (N, 3) offsets.
     Used for clothing morph transfer — .mhclo mappings reference original indices.
     """
     all_deltas = {}
+    prefetch_targets(target_dir)
 
     # Load CURATED_TARGETS
     for target_spec in CURATED_TARGETS:
         raw_name = os.path.basename(target_spec)
         sk_name = TARGET_NAME_OVERRIDES.get(raw_name, raw_name)
-        offsets = load_raw_target_offsets(target_dir, target_spec)
-        if offsets:
-            all_deltas[sk_name] = offsets
+        indices, offsets = load_raw_target_offsets(target_dir, target_spec)
+        if len(indices):
+            all_deltas[sk_name] = (indices, offsets)
 
-    # Load SYMMETRIC_TARGETS (merge L/R)
+    # Load SYMMETRIC_TARGETS (merge L/R, summing offsets on shared vertices)
     for sk_name, r_spec, l_spec in SYMMETRIC_TARGETS:
-        r_offsets = load_raw_target_offsets(target_dir, r_spec)
-        l_offsets = load_raw_target_offsets(target_dir, l_spec)
-        if not r_offsets and not l_offsets:
+        r_idx, r_offsets = load_raw_target_offsets(target_dir, r_spec)
+        l_idx, l_offsets = load_raw_target_offsets(target_dir, l_spec)
+        if not len(r_idx) and not len(l_idx):
             continue
-        merged = {}
-        for idx, (dx, dy, dz) in r_offsets.items():
-            merged[idx] = (dx, dy, dz)
-        for idx, (dx, dy, dz) in l_offsets.items():
-            if idx in merged:
-                ox, oy, oz = merged[idx]
-                merged[idx] = (ox + dx, oy + dy, oz + dz)
-            else:
-                merged[idx] = (dx, dy, dz)
-        all_deltas[sk_name] = merged
+        indices, inverse = np.unique(np.concatenate([r_idx, l_idx]), return_inverse=True)
+        merged = np.zeros((len(indices), 3), dtype=np.float32)
+        np.add.at(merged, inverse, np.concatenate([r_offsets, l_offsets]))
+        all_deltas[sk_name] = (indices.astype(np.int32), merged)
 
     # Include breast deltas (already in original-index space)
     if breast_deltas:
-        for sk_name, offsets in breast_deltas.items():
-            all_deltas[sk_name] = offsets
+        all_deltas.update(breast_deltas)
 
     print(f"  Collected {len(all_deltas)} morph targets for clothing transfer")
     return all_deltas
 
 
 def _build_adjacency(mesh):
-    """Build vertex adjacency dict from mesh polygons."""
-    adj = {}
-    for poly in mesh.polygons:
-        verts = list(poly.vertices)
-        for i, v in enumerate(verts):
-            if v not in adj:
-                adj[v] = set()
-            for j, v2 in enumerate(verts):
+    """Build vertex adjacency from mesh polygons as CSR arrays (indptr, indices).
+
+    Every pair of vertices sharing a polygon is adjacent, so vertex v's
+    neighbors are indices[indptr[v]:indptr[v + 1]]. Built from bulk
+    foreach_get reads, one pass per polygon size.
+    """
+    num_verts = len(mesh.vertices)
+    loop_verts = np.empty(len(mesh.loops), dtype=np.int64)
+    mesh.loops.foreach_get("vertex_index", loop_verts)
+    loop_start = np.empty(len(mesh.polygons), dtype=np.int64)
+    loop_total = np.empty(len(mesh.polygons), dtype=np.int64)
+    mesh.polygons.foreach_get("loop_start", loop_start)
+    mesh.polygons.foreach_get("loop_total", loop_total)
+
+    src, dst = [], []
+    for k in np.unique(loop_total).tolist():
+        # (P, k) vertex indices of every k-sided polygon
+        polys = loop_verts[loop_start[loop_total == k][:, None] + np.arange(k)]
+        for i in range(k):
+            for j in range(k):
                 if i != j:
-                    adj[v].add(v2)
-    return adj
+                    src.append(polys[:, i])
+                    dst.append(polys[:, j])
+    if not src:
+        return np.zeros(num_verts + 1, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    pairs = np.unique(np.concatenate(src) * num_verts + np.concatenate(dst))
+    indices = pairs % num_verts
+    indptr = np.zeros(num_verts + 1, dtype=np.int64)
+    np.cumsum(np.bincount(pairs // num_verts, minlength=num_verts), out=indptr[1:])
+    return indptr, indices
 
 
-def _smooth_deltas(clothing_deltas, adjacency, num_verts, iterations=4):
+def _smooth_deltas(deltas, has_delta, adjacency, iterations=4):
     """Smooth morph deltas across clothing mesh to prevent tearing.
 
-    Two operations per iteration:
+    deltas is a (V, 3) array and has_delta a (V,) bool mask of the vertices
+    that carry a delta; adjacency is the (indptr, indices) pair from
+    _build_adjacency. Returns new (deltas, has_delta) arrays.
+
+    Two operations per iteration, each applied to all vertices at once
+    against the neighbor average of the previous iteration:
     1. PROPAGATE: unaffected vertices adopt attenuated neighbor deltas
     2. BOOST: vertices with deltas much smaller than their neighbors get
        blended toward the neighbor average (fixes knee seam where some
        vertices have small deltas while neighbors have large ones)
     """
-    current = dict(clothing_deltas)
+    indptr, indices = adjacency
+    num_verts = len(has_delta)
+    rows = np.repeat(np.arange(num_verts), np.diff(indptr))
+    current, mask = deltas, has_delta
     for it in range(iterations):
-        new_deltas = dict(current)
-        propagated = 0
-        boosted = 0
-        for vi in range(num_verts):
-            if vi not in adjacency:
-                continue
-            # Gather neighbor deltas
-            neighbor_deltas = []
-            for nv in adjacency[vi]:
-                if nv in current:
-                    neighbor_deltas.append(current[nv])
-            if not neighbor_deltas:
-                continue
-            # Compute average neighbor delta
-            avg_dx = sum(d[0] for d in neighbor_deltas) / len(neighbor_deltas)
-            avg_dy = sum(d[1] for d in neighbor_deltas) / len(neighbor_deltas)
-            avg_dz = sum(d[2] for d in neighbor_deltas) / len(neighbor_deltas)
-            avg_mag = (avg_dx ** 2 + avg_dy ** 2 + avg_dz ** 2) ** 0.5
-
-            if vi in current:
-                # BOOST: if this vertex's delta is much smaller than neighbors,
-                # blend toward neighbor average to prevent discontinuities
-                cur = current[vi]
-                cur_mag = (cur[0] ** 2 + cur[1] ** 2 + cur[2] ** 2) ** 0.5
-                if avg_mag > 0.002 and cur_mag < avg_mag * 0.4:
-                    blend = 0.4  # blend 40% toward neighbor average
-                    new_deltas[vi] = (
-                        cur[0] + blend * (avg_dx - cur[0]),
-                        cur[1] + blend * (avg_dy - cur[1]),
-                        cur[2] + blend * (avg_dz - cur[2]),
-                    )
-                    boosted += 1
-            else:
-                # PROPAGATE: give this vertex an attenuated neighbor delta
-                attenuation = 0.6 ** (it + 1)
-                new_dx = avg_dx * attenuation
-                new_dy = avg_dy * attenuation
-                new_dz = avg_dz * attenuation
-                mag = (new_dx ** 2 + new_dy ** 2 + new_dz ** 2) ** 0.5
-                if mag > 1e-6:
-                    new_deltas[vi] = (new_dx, new_dy, new_dz)
-                    propagated += 1
-        current = new_deltas
-        if propagated == 0 and boosted == 0:
+        # Average delta over each vertex's neighbors that carry one
+        nb_mask = mask[indices]
+        count = np.bincount(rows, weights=nb_mask, minlength=num_verts)
+        nb_deltas = current[indices] * nb_mask[:, None]
+        avg = np.stack([np.bincount(rows, weights=nb_deltas[:, c], minlength=num_verts)
+                        for c in range(3)], axis=1)
+        has_nb = count > 0
+        avg[has_nb] /= count[has_nb, None]
+        avg_mag = np.linalg.norm(avg, axis=1)
+
+        # BOOST: blend 40% toward neighbor average to prevent discontinuities
+        cur_mag = np.linalg.norm(current, axis=1)
+        boost = mask & has_nb & (avg_mag > 0.002) & (cur_mag < avg_mag * 0.4)
+        # PROPAGATE: give unaffected vertices an attenuated neighbor delta
+        attenuation = 0.6 ** (it + 1)
+        propagate = ~mask & has_nb & (avg_mag * attenuation > 1e-6)
+
+        if not boost.any() and not propagate.any():
             break
-    return current
+        current = current.copy()
+        current[boost] += 0.4 * (avg[boost] - current[boost])
+        current[propagate] = avg[propagate] * attenuation
+        mask = mask | propagate
+    return current, mask
 
 
-def transfer_morphs_to_clothing(asset_obj, vertex_mappings, all_morph_deltas, basemesh):
+def build_body_delta_matrix(all_morph_deltas, num_verts):
+    """Scatter collect_all_morph_deltas() output into one dense array.
+
+    Returns (morph_names, matrix) where matrix is float32 (M, num_verts, 3),
+    zero for vertices a morph does not move. Built once and shared by every
+    clothing item.
+    """
+    morph_names = list(all_morph_deltas)
+    matrix = np.zeros((len(morph_names), num_verts, 3), dtype=np.float32)
+    for m, (indices, offsets) in enumerate(all_morph_deltas.values()):
+        matrix[m, indices] = offsets
+    return morph_names, matrix
+
+
+def transfer_morphs_to_clothing(asset_obj, vertex_mappings, morph_names, body_matrix, basemesh):
     """Create shape keys on a clothing mesh by interpolating body morph deltas
     through the .mhclo barycentric vertex mappings.
 
+    morph_names and body_matrix come from build_body_delta_matrix().
+
     For each body morph target, each clothing vertex's delta is computed as:
       clothing_delta = w1*body_delta(v1) + w2*body_delta(v2) + w3*body_delta(v3)
 
@@ -550,88 +703,76 @@ def transfer_morphs_to_clothing(asset_obj, vertex_mappings, all_morph_deltas, ba
     # Build adjacency graph for delta smoothing
     adjacency = _build_adjacency(mesh)
 
+    # Partition the .mhclo mappings once into 1:1 copies and barycentric
+    # triangles. Other mapping lengths, and body indices outside the delta
+    # matrix, get no delta.
+    num_mapped = min(len(vertex_mappings), num_proxy_verts)
+    num_body = body_matrix.shape[1]
+    one_dst, one_src, tri_dst, tri_idx, tri_w, _tri_off = partition_mappings(vertex_mappings, num_mapped)
+    one_valid = one_src < num_body
+    one_dst, one_src = one_dst[one_valid], one_src[one_valid]
+    out_of_range = tri_idx >= num_body
+    tri_idx[out_of_range] = 0
+    tri_w[out_of_range] = 0.0
+
+    # The 12 nearest body vertices of each mapped clothing vertex, queried
+    # once for all morphs. Neighbors beyond FALLBACK_RADIUS get zero weight.
+    clothing_co = read_vertex_co(mesh)
+    nn_idx = np.zeros((num_mapped, 12), dtype=np.int64)
+    nn_weight = np.zeros((num_mapped, 12))
+    for i in range(num_mapped):
+        for j, (_co, idx, dist) in enumerate(kd.find_n(clothing_co[i], 12)):
+            if dist <= FALLBACK_RADIUS and idx < num_body:
+                nn_idx[i, j] = idx
+                nn_weight[i, j] = 1.0 / max(dist, 0.0001)
+
     # Don't add Basis key yet — only add if we actually create morph targets
     created = 0
     fallback_used_total = 0
     smoothed_total = 0
-    for sk_name, body_deltas in all_morph_deltas.items():
-        # Compute clothing deltas from body deltas via barycentric interpolation
-        clothing_deltas = {}
-        fallback_used = 0
-        for i in range(min(len(vertex_mappings), num_proxy_verts)):
-            mapping = vertex_mappings[i]
-            dx, dy, dz = 0.0, 0.0, 0.0
-
-            if len(mapping) == 1:
-                # Simple 1:1 mapping — copy body delta directly
-                base_idx = mapping[0]
-                if base_idx in body_deltas:
-                    dx, dy, dz = body_deltas[base_idx]
-            elif len(mapping) == 9:
-                # Barycentric: interpolate body deltas with weights
-                v1, v2, v3, w1, w2, w3, _ox, _oy, _oz = mapping
-                v1, v2, v3 = int(v1), int(v2), int(v3)
-                d1 = body_deltas.get(v1, (0, 0, 0))
-                d2 = body_deltas.get(v2, (0, 0, 0))
-                d3 = body_deltas.get(v3, (0, 0, 0))
-                dx = w1 * d1[0] + w2 * d2[0] + w3 * d3[0]
-                dy = w1 * d1[1] + w2 * d2[1] + w3 * d3[1]
-                dz = w1 * d1[2] + w2 * d2[2] + w3 * d3[2]
-
-            interp_mag = (dx * dx + dy * dy + dz * dz) ** 0.5
-
-            # Spatial fallback: if barycentric delta is tiny, check nearest body vertices
-            if interp_mag < 0.0005:
-                clothing_pos = mesh.vertices[i].co
-                nearest = kd.find_n(clothing_pos, 12)
-                total_weight = 0
-                weighted_dx, weighted_dy, weighted_dz = 0, 0, 0
-                for (co, idx, dist) in nearest:
-                    if dist > FALLBACK_RADIUS:
-                        continue
-                    if idx in body_deltas:
-                        bd = body_deltas[idx]
-                        bd_mag = (bd[0] ** 2 + bd[1] ** 2 + bd[2] ** 2) ** 0.5
-                        if bd_mag > 0.001:
-                            w = 1.0 / max(dist, 0.0001)
-                            weighted_dx += bd[0] * w
-                            weighted_dy += bd[1] * w
-                            weighted_dz += bd[2] * w
-                            total_weight += w
-                if total_weight > 0:
-                    dx = weighted_dx / total_weight
-                    dy = weighted_dy / total_weight
-                    dz = weighted_dz / total_weight
-                    fallback_used += 1
-
-            if abs(dx) > 1e-7 or abs(dy) > 1e-7 or abs(dz) > 1e-7:
-                # Scale up to compensate for interpolation smoothing
-                sdx, sdy, sdz = dx * DELTA_SCALE, dy * DELTA_SCALE, dz * DELTA_SCALE
-                # Cap to prevent garbage from depsgraph composite captures
-                smag = (sdx * sdx + sdy * sdy + sdz * sdz) ** 0.5
-                if smag > MAX_DELTA_MAG:
-                    scale_down = MAX_DELTA_MAG / smag
-                    sdx *= scale_down
-                    sdy *= scale_down
-                    sdz *= scale_down
-                clothing_deltas[i] = (sdx, sdy, sdz)
-
-        if not clothing_deltas:
+    base_co = None  # read once, when the first shape key is added
+    for sk_name, body_deltas in zip(morph_names, body_matrix):
+        # Copy 1:1 deltas, interpolate barycentric ones — one array op each
+        raw_deltas = np.zeros((num_mapped, 3))
+        raw_deltas[one_dst] = body_deltas[one_src]
+        raw_deltas[tri_dst] = (body_deltas[tri_idx] * tri_w[:, :, None]).sum(axis=1)
+
+        # Spatial fallback: if barycentric delta is tiny, use the inverse-distance
+        # weighted delta of the nearest affected body vertices
+        fallback = np.flatnonzero(np.linalg.norm(raw_deltas, axis=1) < 0.0005)
+        nn_deltas = body_deltas[nn_idx[fallback]]
+        w = nn_weight[fallback] * (np.linalg.norm(nn_deltas, axis=2) > 0.001)
+        total_weight = w.sum(axis=1)
+        found = total_weight > 0
+        raw_deltas[fallback[found]] = ((nn_deltas * w[:, :, None]).sum(axis=1)[found]
+                                       / total_weight[found, None])
+        fallback_used = int(np.count_nonzero(found))
+
+        # Keep vertices that moved on any axis, scale up to compensate for
+        # interpolation smoothing, and cap to prevent garbage from depsgraph
+        # composite captures — one mask and a few array ops for all vertices
+        moved = np.abs(raw_deltas).max(axis=1) > 1e-7
+        if not moved.any():
             continue
+        deltas = np.zeros((num_proxy_verts, 3))
+        scaled = raw_deltas[moved] * DELTA_SCALE
+        smag = np.sqrt((scaled * scaled).sum(axis=1))
+        over = smag > MAX_DELTA_MAG
+        scaled[over] *= (MAX_DELTA_MAG / smag[over])[:, None]
+        deltas[:num_mapped][moved] = scaled
+        has_delta = np.zeros(num_proxy_verts, dtype=bool)
+        has_delta[:num_mapped] = moved
 
         # Smooth deltas: propagate from affected to unaffected neighbors
         # to prevent sharp discontinuities at morph boundaries (e.g. knee seams)
-        pre_smooth = len(clothing_deltas)
-        clothing_deltas = _smooth_deltas(clothing_deltas, adjacency, num_proxy_verts)
-        smoothed = len(clothing_deltas) - pre_smooth
+        pre_smooth = int(np.count_nonzero(has_delta))
+        deltas, has_delta = _smooth_deltas(deltas, has_delta, adjacency)
+        affected = np.flatnonzero(has_delta)
+        smoothed = len(affected) - pre_smooth
 
         # Filter out morphs with negligible max displacement on this clothing item.
         # Prevents e.g. shoes getting breast morphs from tiny foot-area deltas.
-        max_mag = 0
-        for ddx, ddy, ddz in clothing_deltas.values():
-            mag = (ddx * ddx + ddy * ddy + ddz * ddz) ** 0.5
-            if mag > max_mag:
-                max_mag = mag
+        max_mag = float(np.linalg.norm(deltas[affected], axis=1).max())
         if max_mag < 0.001:
             continue
 
@@ -639,12 +780,9 @@ def transfer_morphs_to_clothing(asset_obj, vertex_mappings, all_morph_deltas, ba
         if not mesh.shape_keys:
             asset_obj.shape_key_add(name="Basis", from_mix=False)
 
-        sk = asset_obj.shape_key_add(name=sk_name, from_mix=False)
-        for idx, (ddx, ddy, ddz) in clothing_deltas.items():
-            base = mesh.vertices[idx].co
-            sk.data[idx].co.x = base.x + ddx
-            sk.data[idx].co.y = base.y + ddy
-            sk.data[idx].co.z = base.z + ddz
+        if base_co is None:
+            base_co = read_vertex_co(mesh)
+        sk = add_offset_shape_key(asset_obj, sk_name, base_co, affected, deltas[affected])
         sk.value = 0.0
         created += 1
         fallback_used_total += fallback_used
@@ -655,13 +793,36 @@ def transfer_morphs_to_clothing(asset_obj, vertex_mappings, all_morph_deltas, ba
         if smoothed > 0:
             extras.append(f"{smoothed} smoothed")
         extra_str = f" ({', '.join(extras)})" if extras else ""
-        print(f"    {sk_name}: {len(clothing_deltas)} verts, max_delta={max_mag:.6f}{extra_str}")
+        print(f"    {sk_name}: {len(affected)} verts, max_delta={max_mag:.6f}{extra_str}")
 
     if fallback_used_total > 0 or smoothed_total > 0:
         print(f"    Total: {fallback_used_total} fallback, {smoothed_total} smoothed vertices")
     return created
 
 
+def _chest_filtered_deltas(basis, key):
+    """Deltas of shape key `key` against `basis`, limited to the chest.
+
+    Keeps vertices that move more than 1e-6 on any axis and whose basis z
+    lies in the 40%-75% band of the mesh height. Returns (int32 indices,
+    float32 (N, 3) offsets, (chest_z_low, chest_z_high)).
+    """
+    base_co = np.empty(len(basis.data) * 3, dtype=np.float32)
+    key_co = np.empty_like(base_co)
+    basis.data.foreach_get("co", base_co)
+    key.data.foreach_get("co", key_co)
+    base_co = base_co.reshape(-1, 3).astype(np.float64)
+    deltas = key_co.reshape(-1, 3) - base_co
+
+    z = base_co[:, 2]
+    z_min, z_max = z.min(), z.max()
+    chest_z_low = z_min + (z_max - z_min) * 0.40
+    chest_z_high = z_min + (z_max - z_min) * 0.75
+    keep = (np.abs(deltas) > 1e-6).any(axis=1) & (z >= chest_z_low) & (z <= chest_z_high)
+    indices = np.flatnonzero(keep).astype(np.int32)
+    return indices, deltas[keep].astype(np.float32), (chest_z_low, chest_z_high)
+
+
 def capture_breast_deltas_from_mpfb2(basemesh):
     """Capture breast morph deltas from MPFB2's shape keys by reading vertex data directly.
 
@@ -673,7 +834,8 @@ def capture_breast_deltas_from_mpfb2(basemesh):
     deltas immediately after each parameter change before the next reapply.
 
     Must be called BEFORE adding rig (add_builtin_rig removes MPFB2's shape keys).
-    Returns dict of {morph_name: {vertex_index: (dx, dy, dz)}} on the ORIGINAL mesh.
+    Returns dict of {morph_name: (indices, offsets)} on the ORIGINAL mesh, where
+    indices is int32 (N,) and offsets float32 (N, 3).
     """
     try:
         from bl_ext.blender_org.mpfb.services.targetservice import TargetService
@@ -685,7 +847,6 @@ def capture_breast_deltas_from_mpfb2(basemesh):
     original_firmness = basemesh.MPFB_HUM_firmness
     print(f"  Current cupsize={original_cupsize}, firmness={original_firmness}")
 
-    num_verts = len(basemesh.data.vertices)
     result = {}
 
     def get_basis_and_target(param_name, param_value):
@@ -717,28 +878,12 @@ def capture_breast_deltas_from_mpfb2(basemesh):
                 break
         if cup_key:
             print(f"    Cup key: {cup_key.name}")
-            # Spatial filter setup
-            z_values = [basis.data[i].co.z for i in range(num_verts)]
-            z_min, z_max = min(z_values), max(z_values)
-            z_range = z_max - z_min
-            chest_z_low = z_min + z_range * 0.40
-            chest_z_high = z_min + z_range * 0.75
+            cup_idx, cup_d, (chest_z_low, chest_z_high) = _chest_filtered_deltas(basis, cup_key)
             print(f"    Breast region: z={chest_z_low:.4f} to {chest_z_high:.4f}")
-
-            cup_offsets = {}
-            for i in range(num_verts):
-                sk_co = cup_key.data[i].co
-                b_co = basis.data[i].co
-                dx, dy, dz = sk_co.x - b_co.x, sk_co.y - b_co.y, sk_co.z - b_co.z
-                if abs(dx) > 1e-6 or abs(dy) > 1e-6 or abs(dz) > 1e-6:
-                    if b_co.z < chest_z_low or b_co.z > chest_z_high:
-                        continue
-                    cup_offsets[i] = (float(dx), float(dy), float(dz))
-
-            result["breast-size-incr"] = cup_offsets
-            result["breast-size-decr"] = {i: (-dx, -dy, -dz) for i, (dx, dy, dz) in cup_offsets.items()}
-            print(f"    breast-size-incr: {len(cup_offsets)} vertices (chest-filtered)")
-            print(f"    breast-size-decr: {len(cup_offsets)} vertices (negated)")
+            result["breast-size-incr"] = (cup_idx, cup_d)
+            result["breast-size-decr"] = (cup_idx, -cup_d)
+            print(f"    breast-size-incr: {len(cup_idx)} vertices (chest-filtered)")
+            print(f"    breast-size-decr: {len(cup_idx)} vertices (negated)")
         else:
             print("    WARNING: maxcup key not found after setting cupsize=1.0")
 
@@ -754,26 +899,11 @@ def capture_breast_deltas_from_mpfb2(basemesh):
                 break
         if firm_key:
             print(f"    Firm key: {firm_key.name}")
-            z_values = [basis.data[i].co.z for i in range(num_verts)]
-            z_min, z_max = min(z_values), max(z_values)
-            z_range = z_max - z_min
-            chest_z_low = z_min + z_range * 0.40
-            chest_z_high = z_min + z_range * 0.75
-
-            firm_offsets = {}
-            for i in range(num_verts):
-                sk_co = firm_key.data[i].co
-                b_co = basis.data[i].co
-                dx, dy, dz = sk_co.x - b_co.x, sk_co.y - b_co.y, sk_co.z - b_co.z
-                if abs(dx) > 1e-6 or abs(dy) > 1e-6 or abs(dz) > 1e-6:
-                    if b_co.z < chest_z_low or b_co.z > chest_z_high:
-                        continue
-                    firm_offsets[i] = (float(dx), float(dy), float(dz))
-
-            result["breast-firmness-incr"] = firm_offsets
-            result["breast-firmness-decr"] = {i: (-dx, -dy, -dz) for i, (dx, dy, dz) in firm_offsets.items()}
-            print(f"    breast-firmness-incr: {len(firm_offsets)} vertices (chest-filtered)")
-            print(f"    breast-firmness-decr: {len(firm_offsets)} vertices (negated)")
+            firm_idx, firm_d, _chest_range = _chest_filtered_deltas(basis, firm_key)
+            result["breast-firmness-incr"] = (firm_idx, firm_d)
+            result["breast-firmness-decr"] = (firm_idx, -firm_d)
+            print(f"    breast-firmness-incr: {len(firm_idx)} vertices (chest-filtered)")
+            print(f"    breast-firmness-decr: {len(firm_idx)} vertices (negated)")
         else:
             print("    WARNING: maxfirmness key not found after setting firmness=1.0")
 
@@ -786,7 +916,7 @@ def capture_breast_deltas_from_mpfb2(basemesh):
     return result
 
 
-def add_captured_breast_morphs(basemesh, breast_deltas, old_to_new):
+def add_captured_breast_morphs(basemesh, breast_deltas, vertex_lut):
     """Add breast shape keys from captured depsgraph deltas, remapped to body-only mesh."""
     mesh = basemesh.data
     num_verts = len(mesh.vertices)
@@ -794,28 +924,20 @@ def add_captured_breast_morphs(basemesh, breast_deltas, old_to_new):
     if not mesh.shape_keys:
         basemesh.shape_key_add(name="Basis", from_mix=False)
 
+    base_co = read_vertex_co(mesh)
     created = 0
-    for sk_name, offsets_orig in breast_deltas.items():
+    for sk_name, (orig_idx, offsets) in breast_deltas.items():
         # Remap from original vertex indices to body-only indices
-        remapped = {}
-        for orig_idx, (dx, dy, dz) in offsets_orig.items():
-            new_idx = old_to_new.get(orig_idx)
-            if new_idx is not None and new_idx < num_verts:
-                remapped[new_idx] = (dx, dy, dz)
+        new_idx, keep = remap_vertex_indices(vertex_lut, orig_idx, num_verts)
 
-        if not remapped:
+        if not len(new_idx):
             print(f"  {sk_name}: no vertices after remap, skipping")
             continue
 
-        sk = basemesh.shape_key_add(name=sk_name, from_mix=False)
-        for idx, (dx, dy, dz) in remapped.items():
-            base = mesh.vertices[idx].co
-            sk.data[idx].co.x = base.x + dx
-            sk.data[idx].co.y = base.y + dy
-            sk.data[idx].co.z = base.z + dz
+        sk = add_offset_shape_key(basemesh, sk_name, base_co, new_idx, offsets[keep])
         sk.value = 0.0
 
-        print(f"  {sk_name}: {len(remapped)} vertices")
+        print(f"  {sk_name}: {len(new_idx)} vertices")
         created += 1
 
     return created
@@ -853,6 +975,8 @@ CLOTHING_CATEGORIES = {
 }
 # Flat list for iteration
 CLOTHING_ASSETS = [item for cat in CLOTHING_CATEGORIES.values() for item in cat]
+# Asset name -> category, for per-item lookups
+NAME_TO_CATEGORY = {n: cat for cat, items in CLOTHING_CATEGORIES.items() for n, _ in items}
 
 
 def parse_mhclo(mhclo_path):
@@ -863,22 +987,59 @@ def parse_mhclo(mhclo_path):
       - Barycentric (9 values per line): v1 v2 v3 w1 w2 w3 ox oy oz
         proxy_vert = w1*pos(v1) + w2*pos(v2) + w3*pos(v3) + (ox, oy, oz)
 
-    Returns (obj_file, mat_file, vertex_mappings, scale_ref)
+    Returns (obj_file, mat_file, vertex_mappings, scale_ref, delete_verts)
     where scale_ref is (v1_idx, v2_idx, ref_distance) from x_scale line, or None.
+    The file is only read once per run; vertex_mappings is a shared tuple and
+    delete_verts a fresh set the caller may modify.
     """
+    obj_file, mat_file, vertex_mappings, scale_ref, delete_verts = _read_mhclo(mhclo_path)
+    return obj_file, mat_file, vertex_mappings, scale_ref, set(delete_verts)
+
+
+@functools.lru_cache(maxsize=None)
+def _read_mhclo(mhclo_path):
+    """Cached parse behind parse_mhclo; mappings and delete_verts are immutable."""
     mhclo_dir = os.path.dirname(mhclo_path)
     obj_file = None
     mat_file = None
     scale_ref = None  # (v1_idx, v2_idx, ref_distance) from x_scale
     vertex_mappings = []  # list of tuples: either (vidx,) or (v1,v2,v3,w1,w2,w3,ox,oy,oz)
+    delete_ranges = []  # (lo, hi) inclusive index ranges from delete_verts
+    delete_singles = []
     in_verts = False
+    in_delete = False
 
+    # One pass over the file; "verts" and "delete_verts" switch sections
     with open(mhclo_path, "r") as f:
         for line in f:
             line = line.strip()
             if not line or line.startswith("#"):
                 continue
 
+            if in_delete:
+                # Parse vertex indices and ranges: "1355 - 1459 1471 - 1482 1502"
+                tokens = line.split()
+                i = 0
+                while i < len(tokens):
+                    try:
+                        v = int(tokens[i])
+                        if i + 2 < len(tokens) and tokens[i + 1] == "-":
+                            delete_ranges.append((v, int(tokens[i + 2])))
+                            i += 3
+                        else:
+                            delete_singles.append(v)
+                            i += 1
+                    except ValueError:
+                        in_delete = False
+                        break
+                if in_delete:
+                    continue
+                # A non-index line ends the section; handle it as a keyword below
+
+            if line == "delete_verts":
+                in_delete = True
+                in_verts = False
+                continue
             if line.startswith("obj_file "):
                 obj_file = os.path.join(mhclo_dir, line.split(None, 1)[1])
             elif line.startswith("material "):
@@ -920,38 +1081,78 @@ def parse_mhclo(mhclo_path):
                     except ValueError:
                         pass  # Keyword line, skip
 
-    # Parse delete_verts section (body vertices to hide when wearing this item)
-    delete_verts = set()
-    in_delete = False
-    # Re-read the file for delete_verts (simpler than tracking state above)
-    with open(mhclo_path, "r") as f:
+    # Ranges and single indices become one index array
+    delete_arr = np.concatenate(
+        [np.arange(lo, hi + 1, dtype=np.int64) for lo, hi in delete_ranges]
+        + [np.array(delete_singles, dtype=np.int64)])
+    delete_verts = frozenset(delete_arr.tolist())  # body vertices to hide when wearing this item
+
+    return obj_file, mat_file, tuple(vertex_mappings), scale_ref, delete_verts
+
+
+@functools.lru_cache(maxsize=None)
+def parse_mhmat_texture(mat_file):
+    """Return the diffuse texture path named in a .mhmat file, or None.
+
+    Cached per path, since clothing variants often share one material.
+    """
+    if not mat_file or not os.path.exists(mat_file):
+        return None
+    tex_file = None
+    mat_dir = os.path.dirname(mat_file)
+    with open(mat_file, "r") as f:
         for line in f:
             line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            if line == "delete_verts":
-                in_delete = True
-                continue
-            if in_delete:
-                # Parse vertex indices and ranges: "1355 - 1459 1471 - 1482 1502"
-                tokens = line.split()
-                i = 0
-                while i < len(tokens):
-                    try:
-                        v = int(tokens[i])
-                        if i + 2 < len(tokens) and tokens[i + 1] == "-":
-                            end = int(tokens[i + 2])
-                            for vi in range(v, end + 1):
-                                delete_verts.add(vi)
-                            i += 3
-                        else:
-                            delete_verts.add(v)
-                            i += 1
-                    except ValueError:
-                        in_delete = False
-                        break
+            if line.startswith("diffuseTexture "):
+                tex_ref = line.split(None, 1)[1]
+                tex_file = os.path.join(mat_dir, tex_ref)
+    return tex_file
+
+
+AssetFiles = namedtuple("AssetFiles", "mhclo obj mat tex")
+
+
+def resolve_asset_files(base_dir, rel_path):
+    """Locate an asset's .mhclo and the .obj/.mhmat/texture files it names.
+
+    Every path is checked once here; members that are missing (or not named
+    by the .mhclo) are None. Later members are only resolved when mhclo is.
+    """
+    mhclo_path = os.path.join(base_dir, rel_path)
+    if not os.path.isfile(mhclo_path):
+        return AssetFiles(None, None, None, None)
+    obj_file, mat_file, _mappings, _scale_ref, _delete_verts = _read_mhclo(mhclo_path)
+    if not obj_file or not os.path.isfile(obj_file):
+        obj_file = None
+    if not mat_file or not os.path.isfile(mat_file):
+        mat_file = None
+    tex_file = parse_mhmat_texture(mat_file)
+    if tex_file and not os.path.isfile(tex_file):
+        tex_file = None
+    return AssetFiles(mhclo_path, obj_file, mat_file, tex_file)
 
-    return obj_file, mat_file, vertex_mappings, scale_ref, delete_verts
+
+def partition_mappings(vertex_mappings, count):
+    """Split the first `count` .mhclo mappings into flat arrays by kind.
+
+    Returns (one_dst, one_src, tri_dst, tri_idx, tri_w, tri_off): proxy rows
+    and body vertex of the 1:1 mappings, then proxy rows, (N, 3) body
+    vertices, (N, 3) weights and (N, 3) unscaled offsets of the barycentric
+    ones. Mappings of any other length appear in neither group.
+    """
+    one_dst, one_src, tri_dst, tri_rows = [], [], [], []
+    for i in range(count):
+        mapping = vertex_mappings[i]
+        if len(mapping) == 1:
+            one_dst.append(i)
+            one_src.append(mapping[0])
+        elif len(mapping) == 9:
+            tri_dst.append(i)
+            tri_rows.append(mapping)
+    tri = np.array(tri_rows, dtype=np.float64).reshape(-1, 9)
+    return (np.array(one_dst, dtype=np.int64), np.array(one_src, dtype=np.int64),
+            np.array(tri_dst, dtype=np.int64), tri[:, 0:3].astype(np.int64),
+            tri[:, 3:6], tri[:, 6:9])
 
 
 def compute_offset_scale(basemesh, scale_ref):
@@ -994,30 +1195,23 @@ def fit_proxy_to_basemesh(asset_obj, basemesh, vertex_mappings, offset_scale=0.1
     else:
         count = len(vertex_mappings)
 
-    fitted = 0
-    for i in range(count):
-        mapping = vertex_mappings[i]
-        if len(mapping) == 1:
-            # Simple 1:1 mapping
-            base_idx = mapping[0]
-            if base_idx < len(base_verts):
-                proxy_verts[i].co = base_verts[base_idx].co.copy()
-                fitted += 1
-        elif len(mapping) == 9:
-            # Barycentric with offset — offsets must be scaled
-            v1, v2, v3, w1, w2, w3, ox, oy, oz = mapping
-            if v1 < len(base_verts) and v2 < len(base_verts) and v3 < len(base_verts):
-                p1 = base_verts[v1].co
-                p2 = base_verts[v2].co
-                p3 = base_verts[v3].co
-                x = w1 * p1.x + w2 * p2.x + w3 * p3.x + ox * offset_scale
-                y = w1 * p1.y + w2 * p2.y + w3 * p3.y + oy * offset_scale
-                z = w1 * p1.z + w2 * p2.z + w3 * p3.z + oz * offset_scale
-                proxy_verts[i].co.x = x
-                proxy_verts[i].co.y = y
-                proxy_verts[i].co.z = z
-                fitted += 1
+    num_base = len(base_verts)
+    base_co = read_vertex_co(basemesh.data).astype(np.float64)
+    proxy_co = read_vertex_co(asset_obj.data)
+    one_dst, one_src, tri_dst, tri_idx, tri_w, tri_off = partition_mappings(vertex_mappings, count)
+
+    # Simple 1:1 mapping
+    ok = one_src < num_base
+    proxy_co[one_dst[ok]] = base_co[one_src[ok]]
+    fitted = int(np.count_nonzero(ok))
 
+    # Barycentric with offset — offsets must be scaled
+    ok = (tri_idx < num_base).all(axis=1)
+    tri_co = (base_co[tri_idx[ok]] * tri_w[ok, :, None]).sum(axis=1) + tri_off[ok] * offset_scale
+    proxy_co[tri_dst[ok]] = tri_co
+    fitted += int(np.count_nonzero(ok))
+
+    proxy_verts.foreach_set("co", proxy_co.ravel())
     asset_obj.data.update()
     return fitted
 
@@ -1026,26 +1220,19 @@ def adjust_teeth_position(asset_obj):
     """Scale and push teeth to prevent lip clipping.
     The teeth mesh is fitted accurately but extends slightly past the lips.
     Scale inward and push backward to hide behind lips."""
-    import mathutils
-
     verts = asset_obj.data.vertices
-
-    # Compute centroid of teeth mesh
-    center = mathutils.Vector((0, 0, 0))
-    for v in verts:
-        center += v.co
-    center /= len(verts)
+    co = read_vertex_co(asset_obj.data).astype(np.float64)
 
     # Scale teeth to 92% around centroid (shrink into mouth)
     scale_factor = 0.92
-    for v in verts:
-        v.co = center + (v.co - center) * scale_factor
+    center = co.mean(axis=0)
+    co = center + (co - center) * scale_factor
 
     # Also push backward (+Y in Blender = deeper into mouth)
     push_amount = 0.003
-    for v in verts:
-        v.co.y += push_amount
+    co[:, 1] += push_amount
 
+    verts.foreach_set("co", co.astype(np.float32).ravel())
     asset_obj.data.update()
     print(f"  Teeth: scaled to {scale_factor*100:.0f}% + pushed {push_amount} inward ({len(verts)} verts)")
 
@@ -1059,32 +1246,20 @@ def load_system_assets(basemesh):
 
     Must be called while the basemesh still has its full vertex set.
     """
-    system_dir = os.path.join(PROJECT_DIR, "assets", "system")
     loaded = []
 
     for name, rel_path in SYSTEM_ASSETS:
-        mhclo_path = os.path.join(system_dir, rel_path)
-        if not os.path.exists(mhclo_path):
-            print(f"  MISSING: {mhclo_path}")
+        files = resolve_asset_files(SYSTEM_ASSET_DIR, rel_path)
+        if not files.mhclo:
+            print(f"  MISSING: {os.path.join(SYSTEM_ASSET_DIR, rel_path)}")
             continue
-
-        # Parse .mhclo for obj path, material, vertex mappings, and scale reference
-        obj_file, mat_file, vertex_mappings, scale_ref, delete_verts = parse_mhclo(mhclo_path)
-
-        if not obj_file or not os.path.exists(obj_file):
+        if not files.obj:
             print(f"  {name}: no obj file found")
             continue
 
-        # Find texture from .mhmat file
-        tex_file = None
-        if mat_file and os.path.exists(mat_file):
-            mat_dir = os.path.dirname(mat_file)
-            with open(mat_file, "r") as f:
-                for line in f:
-                    line = line.strip()
-                    if line.startswith("diffuseTexture "):
-                        tex_ref = line.split(None, 1)[1]
-                        tex_file = os.path.join(mat_dir, tex_ref)
+        # Parse .mhclo for vertex mappings and scale reference
+        _obj, _mat, vertex_mappings, scale_ref, delete_verts = parse_mhclo(files.mhclo)
+        obj_file, tex_file = files.obj, files.tex
 
         try:
             # Import the OBJ (for topology: faces, UVs, normals)
@@ -1133,7 +1308,7 @@ def load_system_assets(basemesh):
             mat.use_nodes = True
             bsdf = mat.node_tree.nodes.get("Principled BSDF")
 
-            if tex_file and os.path.exists(tex_file):
+            if tex_file:
                 tex_node = mat.node_tree.nodes.new("ShaderNodeTexImage")
                 tex_node.image = bpy.data.images.load(tex_file)
                 mat.node_tree.links.new(tex_node.outputs["Color"], bsdf.inputs["Base Color"])
@@ -1156,8 +1331,13 @@ def load_system_assets(basemesh):
                     bsdf.inputs["Base Color"].default_value = (0.95, 0.93, 0.88, 1.0)
 
             # Replace any existing materials
-            asset_obj.data.materials.clear()
-            asset_obj.data.materials.append(mat)
+            # The OBJ import usually leaves one slot; overwrite it in place
+            materials = asset_obj.data.materials
+            if len(materials) == 1:
+                materials[0] = mat
+            else:
+                materials.clear()
+                materials.append(mat)
 
             vcount = len(asset_obj.data.vertices)
             print(f"  {name}: loaded ({vcount} vertices, tex={'yes' if tex_file else 'no'})")
@@ -1171,7 +1351,7 @@ def load_system_assets(basemesh):
     return loaded
 
 
-def transfer_bone_weights_via_mappings(asset_obj, vertex_mappings, weight_mesh, old_to_new):
+def transfer_bone_weights_via_mappings(asset_obj, vertex_mappings, weight_mesh, vertex_lut):
     """Transfer bone weights from weight_mesh to clothing using mhclo vertex mappings.
 
     Uses the exact barycentric correspondences from .mhclo files instead of
@@ -1179,7 +1359,7 @@ def transfer_bone_weights_via_mappings(asset_obj, vertex_mappings, weight_mesh,
 
     vertex_mappings: list of mappings from parse_mhclo (1:1 or barycentric)
     weight_mesh: the mesh with bone weights (e.g. Mixamo-rigged body, body-only verts)
-    old_to_new: dict mapping original MPFB2 vertex indices to body-only indices
+    vertex_lut: int32 array mapping original MPFB2 vertex indices to body-only indices (-1 = none)
     """
     # Build a map of bone weights per vertex on weight_mesh
     # For each vertex group (bone), get weights for all vertices
@@ -1192,6 +1372,7 @@ def transfer_bone_weights_via_mappings(asset_obj, vertex_mappings, weight_mesh,
 
     # For each clothing vertex, interpolate bone weights from mapped body vertices
     transferred = 0
+    lut = vertex_lut.tolist()  # plain ints for the per-vertex lookups below
     for cloth_idx in range(min(len(vertex_mappings), len(asset_obj.data.vertices))):
         mapping = vertex_mappings[cloth_idx]
 
@@ -1209,8 +1390,8 @@ def transfer_bone_weights_via_mappings(asset_obj, vertex_mappings, weight_mesh,
         mapped_indices = []
         mapped_bary = []
         for bi, bw in zip(body_indices, bary_weights):
-            new_idx = old_to_new.get(bi)
-            if new_idx is not None and new_idx < len(weight_mesh.data.vertices):
+            new_idx = lut[bi] if 0 <= bi < len(lut) else -1
+            if 0 <= new_idx < len(weight_mesh.data.vertices):
                 mapped_indices.append(new_idx)
                 mapped_bary.append(bw)
 
@@ -1382,6 +1563,154 @@ def transfer_bone_weights_via_mappings(asset_obj, vertex_mappings, weight_mesh,
     return transferred
 
 
+def _apply_shape_key_deltas(sk, base_co, deltas, threshold=1e-6):
+    """Write base_co + deltas into shape key sk with a single foreach_set.
+
+    base_co and deltas are flat (3N) arrays. Vertices whose delta is below
+    threshold on every axis keep the basis position, same as skipping them.
+    """
+    d = deltas.reshape(-1, 3)
+    moved = np.any(np.abs(d) > threshold, axis=1)
+    co = np.array(base_co, dtype=np.float32).reshape(-1, 3)
+    co[moved] += d[moved]
+    sk.data.foreach_set("co", co.ravel())
+
+
+def bake_subdivision_with_morphs(obj, levels=1, keep_empty=True, verbose=False):
+    """Apply a SubSurf modifier to obj while keeping its shape keys.
+
+    export_apply=True strips shape keys, so the subdivision is baked by hand:
+    each key is evaluated at value 1.0 through the SubSurf, all keys are
+    removed, the same modifier is applied to the bare mesh, and the keys are
+    rebuilt from the captured subdivided deltas. Objects without shape keys
+    just get the modifier applied.
+
+    Any Armature modifier is removed for the bake and re-added afterwards
+    (vertex groups persist on the mesh data regardless).
+
+    keep_empty: keep shape keys with no subdivided displacement.
+    Returns (armature_obj, baked_count) where armature_obj is the object of
+    the re-added Armature modifier, or None if there was none.
+    """
+    bpy.context.view_layer.objects.active = obj
+
+    saved_arm_obj = None
+    for m in list(obj.modifiers):
+        if m.type == 'ARMATURE':
+            saved_arm_obj = m.object
+            obj.modifiers.remove(m)
+            break
+
+    subsurf = obj.modifiers.new(name="Subdivision", type='SUBSURF')
+    subsurf.levels = levels
+    subsurf.render_levels = levels
+
+    had_keys = obj.data.shape_keys is not None
+    sk_names = []
+    if had_keys:
+        # Zero all keys, evaluate subdivided Basis
+        key_blocks = obj.data.shape_keys.key_blocks[1:]
+        for sk in key_blocks:
+            sk.value = 0.0
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        eval_obj = obj.evaluated_get(depsgraph)
+        eval_mesh = eval_obj.to_mesh(preserve_all_data_layers=False, depsgraph=depsgraph)
+        subdiv_vcount = len(eval_mesh.vertices)
+        basis_co = np.empty(subdiv_vcount * 3, dtype=np.float32)
+        eval_mesh.vertices.foreach_get("co", basis_co)
+        eval_obj.to_mesh_clear()
+        if verbose:
+            print(f"  Subdivided vertex count: {subdiv_vcount}")
+
+        # Subdivision is linear in the cage positions, so a key that moves no
+        # cage vertex has no subdivided displacement either. Find those from
+        # the cage data and only evaluate the keys that actually move.
+        cage_co = np.empty(len(obj.data.vertices) * 3, dtype=np.float32)
+        obj.data.shape_keys.reference_key.data.foreach_get("co", cage_co)
+        key_co = np.empty_like(cage_co)
+        moving = []
+        for sk in key_blocks:
+            sk.data.foreach_get("co", key_co)
+            moving.append(bool((np.abs(key_co - cage_co) > 1e-6).any()))
+
+        # For each moving key, set value=1, evaluate, and capture positions
+        # straight into its row of one preallocated (K, 3V) array. Only
+        # positions are needed, so skip copying UVs/colors. The depsgraph and
+        # evaluated object stay the same across updates; each temporary mesh
+        # is freed right after its positions are read.
+        all_co = np.empty((len(key_blocks), subdiv_vcount * 3), dtype=np.float32)
+        for k, sk in enumerate(key_blocks):
+            if not moving[k]:
+                all_co[k] = basis_co
+                continue
+            sk.value = 1.0
+            depsgraph.update()
+            eval_mesh = eval_obj.to_mesh(preserve_all_data_layers=False, depsgraph=depsgraph)
+            eval_mesh.vertices.foreach_get("co", all_co[k])
+            eval_obj.to_mesh_clear()
+            sk.value = 0.0
+
+        # Deltas for every key at once
+        all_co -= basis_co
+        moved = np.abs(all_co) > 1e-6
+        if verbose:
+            # Per-vertex counts are only needed for the log
+            affected = np.count_nonzero(
+                moved.reshape(len(key_blocks), -1, 3).any(axis=2), axis=1).tolist()
+            for sk, nonzero in zip(key_blocks, affected):
+                print(f"  {sk.name}: {nonzero} affected vertices (subdivided)")
+        for sk, nonzero in zip(key_blocks, moved.any(axis=1).tolist()):
+            sk_names.append(sk.name if nonzero or keep_empty else None)
+
+        # Remove all shape keys in one call so the modifier applies cleanly
+        obj.shape_key_clear()
+
+    # Apply the SubSurf that was just evaluated — no second modifier needed.
+    # When it is the only modifier, swap in the evaluated mesh directly;
+    # new_from_object bakes the whole stack, so anything else on the object
+    # goes through modifier_apply.
+    if len(obj.modifiers) == 1:
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        old_mesh = obj.data
+        new_mesh = bpy.data.meshes.new_from_object(
+            obj.evaluated_get(depsgraph), preserve_all_data_layers=True, depsgraph=depsgraph)
+        obj.modifiers.remove(subsurf)
+        obj.data = new_mesh
+        if old_mesh.users == 0:
+            mesh_name = old_mesh.name
+            bpy.data.meshes.remove(old_mesh)
+            new_mesh.name = mesh_name
+    else:
+        bpy.ops.object.modifier_apply(modifier=subsurf.name)
+
+    # Re-add shape keys with subdivided data
+    baked = 0
+    if had_keys:
+        obj.shape_key_add(name="Basis", from_mix=False)
+        base_co = np.empty(len(obj.data.vertices) * 3, dtype=np.float32)
+        obj.data.vertices.foreach_get("co", base_co)
+        for sk_name, deltas in zip(sk_names, all_co):
+            if sk_name is None:
+                continue
+            sk = obj.shape_key_add(name=sk_name, from_mix=False)
+            _apply_shape_key_deltas(sk, base_co, deltas)
+            sk.value = 0.0
+            baked += 1
+
+    if saved_arm_obj:
+        arm_mod = obj.modifiers.new(name="Armature", type='ARMATURE')
+        arm_mod.object = saved_arm_obj
+
+    return saved_arm_obj, baked
+
+
+def _write_delete_verts_meta(meta_path, delete_verts):
+    """Write the delete_verts sidecar JSON for a clothing item."""
+    import json as json_mod
+    with open(meta_path, "w") as mf:
+        json_mod.dump({"delete_verts": sorted(delete_verts)}, mf, separators=(",", ":"))
+
+
 def export_clothing_items(basemesh, all_morph_deltas=None, armature_object=None,
                           weight_source=None, weight_mesh_mappings=None):
     """Export each clothing item as a separate GLB, fitted to the basemesh.
@@ -1399,331 +1728,278 @@ def export_clothing_items(basemesh, all_morph_deltas=None, armature_object=None,
     Returns (exported_names, all_delete_verts) where all_delete_verts is the union
     of delete_verts from all clothing items (original basemesh vertex indices).
     """
-    clothing_dir = os.path.join(PROJECT_DIR, "assets", "clothing")
-    output_dir = os.path.join(PROJECT_DIR, "assets", "models", "clothing")
+    output_dir = CLOTHING_OUTPUT_DIR
     os.makedirs(output_dir, exist_ok=True)
 
+    # Dense body morph deltas, shared by every item's morph transfer
+    if all_morph_deltas:
+        morph_names, body_matrix = build_body_delta_matrix(all_morph_deltas, len(basemesh.data.vertices))
+
     exported = []
+    # Texture copies and meta sidecars are written on a background pool so the
+    # next item's import/fit/export doesn't wait on disk I/O.
+    import shutil
+    io_pool = ThreadPoolExecutor(max_workers=2)
+    io_jobs = []  # (name, message, future)
+
     # Collect delete_verts per category for intersection
-    category_delete_verts = {}  # category -> list of sets
+    category_delete_verts = {}  # category -> list of sorted uint32 index arrays
     for cat_name, items in CLOTHING_CATEGORIES.items():
         category_delete_verts[cat_name] = []
 
+    # Check every asset's files and parse its .mhclo up front, so the import
+    # loop below only sees items that can actually be imported. A bad file
+    # skips that item, as it would inside the loop.
+    work_list = []  # (name, files, parsed .mhclo)
     for name, rel_path in CLOTHING_ASSETS:
-        mhclo_path = os.path.join(clothing_dir, rel_path)
-        if not os.path.exists(mhclo_path):
-            print(f"  MISSING: {mhclo_path}")
-            continue
-
-        obj_file, mat_file, vertex_mappings, scale_ref, delete_verts = parse_mhclo(mhclo_path)
-        if not obj_file or not os.path.exists(obj_file):
-            print(f"  {name}: no obj file found")
-            continue
-
-        # Find texture
-        tex_file = None
-        if mat_file and os.path.exists(mat_file):
-            mat_dir = os.path.dirname(mat_file)
-            with open(mat_file, "r") as f:
-                for line in f:
-                    line = line.strip()
-                    if line.startswith("diffuseTexture "):
-                        tex_ref = line.split(None, 1)[1]
-                        tex_file = os.path.join(mat_dir, tex_ref)
-
         try:
-            # Import OBJ
-            before_objs = set(bpy.data.objects.keys())
-            bpy.ops.wm.obj_import(filepath=obj_file, forward_axis='NEGATIVE_Z', up_axis='Y')
-            after_objs = set(bpy.data.objects.keys())
-            new_objs = after_objs - before_objs
-
-            if not new_objs:
-                print(f"  {name}: OBJ import produced no objects")
+            files = resolve_asset_files(CLOTHING_ASSET_DIR, rel_path)
+            if not files.mhclo:
+                print(f"  MISSING: {os.path.join(CLOTHING_ASSET_DIR, rel_path)}")
                 continue
+            if not files.obj:
+                print(f"  {name}: no obj file found")
+                continue
+            parsed = parse_mhclo(files.mhclo)
+        except Exception as e:
+            print(f"  {name}: FAILED - {e}")
+            continue
+        work_list.append((name, files, parsed))
 
-            asset_obj = bpy.data.objects[list(new_objs)[0]]
-            asset_obj.name = name.lower()
-            asset_obj.location = (0, 0, 0)
-            asset_obj.rotation_euler = (0, 0, 0)
-            asset_obj.scale = (1, 1, 1)
-
-            # Fit to basemesh
-            if vertex_mappings:
-                offset_scale = compute_offset_scale(basemesh, scale_ref)
-                fitted = fit_proxy_to_basemesh(asset_obj, basemesh, vertex_mappings, offset_scale)
-                print(f"  {name}: fitted {fitted}/{len(asset_obj.data.vertices)} vertices")
-
-                # Clear custom normals
-                bpy.context.view_layer.objects.active = asset_obj
-                asset_obj.select_set(True)
-                if asset_obj.data.has_custom_normals:
-                    bpy.ops.mesh.customdata_custom_splitnormals_clear()
-                asset_obj.select_set(False)
+    # No undo steps for the imports/ops below; the user's setting is restored
+    # (and background writes drained) in the finally, whatever happens
+    edit_prefs = bpy.context.preferences.edit
+    saved_global_undo = edit_prefs.use_global_undo
+    edit_prefs.use_global_undo = False
 
-            # Create material
-            mat = bpy.data.materials.new(name=f"{name}_mat")
-            mat.use_nodes = True
-            bsdf = mat.node_tree.nodes.get("Principled BSDF")
+    try:
+        for name, files, parsed in work_list:
+            _obj, _mat, vertex_mappings, scale_ref, delete_verts = parsed
+            obj_file, tex_file = files.obj, files.tex
+
+            try:
+                # Import OBJ
+                before_objs = set(bpy.data.objects.keys())
+                bpy.ops.wm.obj_import(filepath=obj_file, forward_axis='NEGATIVE_Z', up_axis='Y')
+                after_objs = set(bpy.data.objects.keys())
+                new_objs = after_objs - before_objs
+
+                if not new_objs:
+                    print(f"  {name}: OBJ import produced no objects")
+                    continue
 
-            if tex_file and os.path.exists(tex_file):
-                tex_node = mat.node_tree.nodes.new("ShaderNodeTexImage")
-                tex_node.image = bpy.data.images.load(tex_file)
-                mat.node_tree.links.new(tex_node.outputs["Color"], bsdf.inputs["Base Color"])
+                asset_obj = bpy.data.objects[list(new_objs)[0]]
+                asset_obj.name = name.lower()
+                asset_obj.location = (0, 0, 0)
+                asset_obj.rotation_euler = (0, 0, 0)
+                asset_obj.scale = (1, 1, 1)
 
-            asset_obj.data.materials.clear()
-            asset_obj.data.materials.append(mat)
-
-            # Smooth shading
-            bpy.context.view_layer.objects.active = asset_obj
-            asset_obj.select_set(True)
-            bpy.ops.object.shade_smooth()
-
-            # Push clothing vertices outward along normals to prevent skin poke-through.
-            # Outer layers (sweaters, jackets) get larger offset than inner layers (pants, boots)
-            # to maintain proper layering at hemlines.
-            import mathutils
-            mesh_data = asset_obj.data
-            name_lower = name.lower()
-            if any(kw in name_lower for kw in ("sweater", "jacket")):
-                offset_amount = 0.035  # thick outer layer — must clear pants waistband
-            elif any(kw in name_lower for kw in ("camisole", "shirt", "top", "blouse", "tank")):
-                offset_amount = 0.012  # thin tops / tanks
-            elif any(kw in name_lower for kw in ("boot", "shoe", "flat", "bootie")):
-                offset_amount = 0.030  # footwear — needs large offset for foot poke-through
-            elif any(kw in name_lower for kw in ("cargo",)):
-                offset_amount = 0.030  # sparse low-poly mesh needs bigger offset
-            elif any(kw in name_lower for kw in ("pant", "harem")):
-                offset_amount = 0.025  # pants need extra offset for knee bends during animation
-            else:
-                offset_amount = 0.015  # default inner layer
-            for v in mesh_data.vertices:
-                n = v.normal
-                if n.length > 0.001:
-                    v.co += n.normalized() * offset_amount
-            mesh_data.update()
-            print(f"  {name}: pushed {len(mesh_data.vertices)} vertices outward by {offset_amount}")
-
-            # Generate delete_verts from proximity if mhclo doesn't provide them.
-            # For each body vertex, check if a nearby clothing vertex exists.
-            if not delete_verts and vertex_mappings:
-                from mathutils.kdtree import KDTree as KDTreeMU
-                kd_cloth = KDTreeMU(len(asset_obj.data.vertices))
-                for cv in asset_obj.data.vertices:
-                    kd_cloth.insert(cv.co, cv.index)
-                kd_cloth.balance()
-
-                threshold = offset_amount + 0.01  # slightly beyond offset
-                vg_body = basemesh.vertex_groups.get("body")
-                if vg_body:
-                    vg_idx = vg_body.index
-                    for bv in basemesh.data.vertices:
-                        in_body = any(g.group == vg_idx and g.weight > 0.5
-                                      for g in bv.groups)
-                        if in_body:
-                            _co, _idx, dist = kd_cloth.find(bv.co)
-                            if dist < threshold:
-                                delete_verts.add(bv.index)
-                    if delete_verts:
-                        print(f"  {name}: generated {len(delete_verts)} delete_verts "
-                              f"from proximity (threshold={threshold:.4f})")
+                # Fit to basemesh
+                if vertex_mappings:
+                    offset_scale = compute_offset_scale(basemesh, scale_ref)
+                    fitted = fit_proxy_to_basemesh(asset_obj, basemesh, vertex_mappings, offset_scale)
+                    print(f"  {name}: fitted {fitted}/{len(asset_obj.data.vertices)} vertices")
 
-            # Track delete_verts per category for intersection (after fitting + generation)
-            for cat_name, items in CLOTHING_CATEGORIES.items():
-                if any(n == name for n, _ in items):
-                    category_delete_verts[cat_name].append(delete_verts if delete_verts else set())
+                    # Clear custom normals (the operator only needs the active object)
+                    bpy.context.view_layer.objects.active = asset_obj
+                    if asset_obj.data.has_custom_normals:
+                        bpy.ops.mesh.customdata_custom_splitnormals_clear()
+
+                # Create material
+                mat = bpy.data.materials.new(name=f"{name}_mat")
+                mat.use_nodes = True
+                bsdf = mat.node_tree.nodes.get("Principled BSDF")
+
+                if tex_file:
+                    tex_node = mat.node_tree.nodes.new("ShaderNodeTexImage")
+                    tex_node.image = bpy.data.images.load(tex_file)
+                    mat.node_tree.links.new(tex_node.outputs["Color"], bsdf.inputs["Base Color"])
+
+                # The OBJ import usually leaves one slot; overwrite it in place
+                materials = asset_obj.data.materials
+                if len(materials) == 1:
+                    materials[0] = mat
+                else:
+                    materials.clear()
+                    materials.append(mat)
+
+                # Smooth shading
+                asset_obj.data.polygons.foreach_set(
+                    "use_smooth", np.ones(len(asset_obj.data.polygons), dtype=bool))
+
+                # Push clothing vertices outward along normals to prevent skin poke-through.
+                # Outer layers (sweaters, jackets) get larger offset than inner layers (pants, boots)
+                # to maintain proper layering at hemlines.
+                mesh_data = asset_obj.data
+                name_lower = name.lower()
+                if any(kw in name_lower for kw in ("sweater", "jacket")):
+                    offset_amount = 0.035  # thick outer layer — must clear pants waistband
+                elif any(kw in name_lower for kw in ("camisole", "shirt", "top", "blouse", "tank")):
+                    offset_amount = 0.012  # thin tops / tanks
+                elif any(kw in name_lower for kw in ("boot", "shoe", "flat", "bootie")):
+                    offset_amount = 0.030  # footwear — needs large offset for foot poke-through
+                elif any(kw in name_lower for kw in ("cargo",)):
+                    offset_amount = 0.030  # sparse low-poly mesh needs bigger offset
+                elif any(kw in name_lower for kw in ("pant", "harem")):
+                    offset_amount = 0.025  # pants need extra offset for knee bends during animation
+                else:
+                    offset_amount = 0.015  # default inner layer
+                # Both buffers are allocated up front so the two bulk reads run
+                # back-to-back over the same vertex array.
+                n_verts = len(mesh_data.vertices)
+                co = np.empty(n_verts * 3, dtype=np.float32)
+                nor = np.empty(n_verts * 3, dtype=np.float32)
+                mesh_data.vertices.foreach_get("co", co)
+                mesh_data.vertices.foreach_get("normal", nor)
+                co = co.reshape(-1, 3)
+                nor = nor.reshape(-1, 3)
+                nor_len = np.linalg.norm(nor, axis=1)
+                valid = nor_len > 0.001
+                co[valid] += nor[valid] / nor_len[valid, None] * offset_amount
+                mesh_data.vertices.foreach_set("co", co.ravel())
+                mesh_data.update()
+                print(f"  {name}: pushed {len(mesh_data.vertices)} vertices outward by {offset_amount}")
+
+                # Generate delete_verts from proximity if mhclo doesn't provide them.
+                # For each body vertex, check if a nearby clothing vertex exists.
+                if not delete_verts and vertex_mappings:
+                    from mathutils.kdtree import KDTree as KDTreeMU
+                    kd_cloth = KDTreeMU(len(asset_obj.data.vertices))
+                    for cv in asset_obj.data.vertices:
+                        kd_cloth.insert(cv.co, cv.index)
+                    kd_cloth.balance()
+
+                    threshold = offset_amount + 0.01  # slightly beyond offset
+                    vg_body = basemesh.vertex_groups.get("body")
+                    if vg_body:
+                        vg_idx = vg_body.index
+                        for bv in basemesh.data.vertices:
+                            in_body = any(g.group == vg_idx and g.weight > 0.5
+                                          for g in bv.groups)
+                            if in_body:
+                                _co, _idx, dist = kd_cloth.find(bv.co)
+                                if dist < threshold:
+                                    delete_verts.add(bv.index)
+                        if delete_verts:
+                            print(f"  {name}: generated {len(delete_verts)} delete_verts "
+                                  f"from proximity (threshold={threshold:.4f})")
+
+                # Track delete_verts per category for intersection (after fitting + generation)
+                cat_name = NAME_TO_CATEGORY.get(name)
+                if cat_name is not None:
+                    category_delete_verts[cat_name].append(
+                        np.fromiter(sorted(delete_verts), dtype=np.uint32, count=len(delete_verts)))
                     if delete_verts:
                         print(f"  {name}: {len(delete_verts)} delete_verts ({cat_name})")
-                    break
-
-            # Transfer bone weights from body to clothing for skeletal animation
-            if armature_object:
-                asset_obj.parent = armature_object
-                asset_obj.parent_type = 'OBJECT'
-
-                used_mhclo = False
-                if weight_mesh_mappings and vertex_mappings:
-                    # Exact transfer via mhclo barycentric mappings (no spatial guessing)
-                    w_mesh, w_old_to_new = weight_mesh_mappings
-                    n_weights = transfer_bone_weights_via_mappings(
-                        asset_obj, vertex_mappings, w_mesh, w_old_to_new)
-                    if n_weights > 0:
-                        print(f"  {name}: transferred {n_weights} bone weight entries via mhclo mappings")
-                        used_mhclo = True
-                    else:
-                        print(f"  {name}: mhclo mapping gave 0 weights, falling back to Data Transfer")
-
-                if not used_mhclo:
-                    # Fallback: spatial proximity via Data Transfer modifier
-                    src = weight_source if weight_source else basemesh
-                    if weight_mesh_mappings and not weight_source:
-                        # Use the weight mesh directly as Data Transfer source
-                        src = weight_mesh_mappings[0]
-                    dt_mod = asset_obj.modifiers.new("DataTransfer", 'DATA_TRANSFER')
-                    dt_mod.object = src
-                    dt_mod.use_vert_data = True
-                    dt_mod.data_types_verts = {'VGROUP_WEIGHTS'}
-                    dt_mod.vert_mapping = 'POLYINTERP_NEAREST'
-                    bpy.context.view_layer.objects.active = asset_obj
-                    bpy.ops.object.datalayout_transfer(modifier=dt_mod.name)
-                    bpy.ops.object.modifier_apply(modifier=dt_mod.name)
-                    vg_count = len(asset_obj.vertex_groups)
-                    print(f"  {name}: transferred {vg_count} bone weight groups via Data Transfer")
-
-                # Add armature modifier
-                arm_mod = asset_obj.modifiers.new("Armature", 'ARMATURE')
-                arm_mod.object = armature_object
-
-            # Transfer morph targets from body to clothing via barycentric interpolation
-            has_morphs = False
-            if all_morph_deltas and vertex_mappings:
-                morph_count = transfer_morphs_to_clothing(asset_obj, vertex_mappings, all_morph_deltas, basemesh)
-                has_morphs = morph_count > 0
-                print(f"  {name}: transferred {morph_count} morph targets to clothing")
-
-            # Bake subdivision into shape keys (same approach as body mesh).
-            # export_apply=True strips shape keys, so we must bake manually.
-            if has_morphs:
-                import numpy as np
-
-                # Temporarily remove Armature modifier for subdivision bake
-                saved_arm_obj = None
-                for m in list(asset_obj.modifiers):
-                    if m.type == 'ARMATURE':
-                        saved_arm_obj = m.object
-                        asset_obj.modifiers.remove(m)
-                        break
 
-                subsurf = asset_obj.modifiers.new(name="Subdivision", type='SUBSURF')
-                subsurf.levels = 1
-                subsurf.render_levels = 1
-
-                # Zero all shape key values, capture subdivided basis
-                for sk in asset_obj.data.shape_keys.key_blocks[1:]:
-                    sk.value = 0.0
-                depsgraph = bpy.context.evaluated_depsgraph_get()
-                eval_obj = asset_obj.evaluated_get(depsgraph)
-                eval_mesh = eval_obj.to_mesh()
-                subdiv_vcount = len(eval_mesh.vertices)
-                basis_co = np.zeros(subdiv_vcount * 3)
-                eval_mesh.vertices.foreach_get("co", basis_co)
-                basis_co = basis_co.copy()
-                eval_obj.to_mesh_clear()
-
-                # Capture each shape key's subdivided positions
-                sk_data = {}
-                for sk in asset_obj.data.shape_keys.key_blocks[1:]:
-                    sk.value = 1.0
-                    depsgraph.update()
-                    eval_obj = asset_obj.evaluated_get(depsgraph)
-                    eval_mesh = eval_obj.to_mesh()
-                    sk_co = np.zeros(subdiv_vcount * 3)
-                    eval_mesh.vertices.foreach_get("co", sk_co)
-                    sk_co = sk_co.copy()
-                    eval_obj.to_mesh_clear()
-                    sk.value = 0.0
-                    deltas = sk_co - basis_co
-                    nonzero = np.count_nonzero(np.abs(deltas.reshape(-1, 3)).max(axis=1) > 1e-6)
-                    if nonzero > 0:
-                        sk_data[sk.name] = deltas
-                print(f"  {name}: baked subdivision for {len(sk_data)} morphs ({subdiv_vcount} verts)")
-
-                # Remove modifier and all shape keys
-                asset_obj.modifiers.remove(subsurf)
-                while asset_obj.data.shape_keys and len(asset_obj.data.shape_keys.key_blocks) > 1:
-                    asset_obj.shape_key_remove(asset_obj.data.shape_keys.key_blocks[-1])
-                if asset_obj.data.shape_keys:
-                    asset_obj.shape_key_remove(asset_obj.data.shape_keys.key_blocks[0])
-
-                # Apply subdivision to base mesh (no shape keys = clean apply)
-                subsurf = asset_obj.modifiers.new(name="Subdivision", type='SUBSURF')
-                subsurf.levels = 1
-                subsurf.render_levels = 1
-                bpy.ops.object.modifier_apply(modifier="Subdivision")
-
-                # Re-add shape keys with subdivided data
-                asset_obj.shape_key_add(name="Basis", from_mix=False)
-                for sk_name_s, deltas in sk_data.items():
-                    sk = asset_obj.shape_key_add(name=sk_name_s, from_mix=False)
-                    deltas_r = deltas.reshape(-1, 3)
-                    for vi in range(len(asset_obj.data.vertices)):
-                        if abs(deltas_r[vi][0]) > 1e-6 or abs(deltas_r[vi][1]) > 1e-6 or abs(deltas_r[vi][2]) > 1e-6:
-                            sk.data[vi].co.x = asset_obj.data.vertices[vi].co.x + deltas_r[vi][0]
-                            sk.data[vi].co.y = asset_obj.data.vertices[vi].co.y + deltas_r[vi][1]
-                            sk.data[vi].co.z = asset_obj.data.vertices[vi].co.z + deltas_r[vi][2]
-                    sk.value = 0.0
-
-                # Re-add Armature modifier after subdivision
-                if saved_arm_obj:
-                    arm_mod = asset_obj.modifiers.new("Armature", 'ARMATURE')
-                    arm_mod.object = saved_arm_obj
-            else:
-                # No morphs — just add SubSurf and apply directly
-                # Temporarily remove Armature modifier for subdivision
-                saved_arm_obj_nm = None
-                for m in list(asset_obj.modifiers):
-                    if m.type == 'ARMATURE':
-                        saved_arm_obj_nm = m.object
-                        asset_obj.modifiers.remove(m)
-                        break
-                subsurf = asset_obj.modifiers.new(name="Subdivision", type='SUBSURF')
-                subsurf.levels = 1
-                subsurf.render_levels = 1
-                bpy.ops.object.modifier_apply(modifier="Subdivision")
-                if saved_arm_obj_nm:
+                # Transfer bone weights from body to clothing for skeletal animation
+                if armature_object:
+                    asset_obj.parent = armature_object
+                    asset_obj.parent_type = 'OBJECT'
+
+                    used_mhclo = False
+                    if weight_mesh_mappings and vertex_mappings:
+                        # Exact transfer via mhclo barycentric mappings (no spatial guessing)
+                        w_mesh, w_vertex_lut = weight_mesh_mappings
+                        n_weights = transfer_bone_weights_via_mappings(
+                            asset_obj, vertex_mappings, w_mesh, w_vertex_lut)
+                        if n_weights > 0:
+                            print(f"  {name}: transferred {n_weights} bone weight entries via mhclo mappings")
+                            used_mhclo = True
+                        else:
+                            print(f"  {name}: mhclo mapping gave 0 weights, falling back to Data Transfer")
+
+                    if not used_mhclo:
+                        # Fallback: spatial proximity via Data Transfer modifier
+                        src = weight_source if weight_source else basemesh
+                        if weight_mesh_mappings and not weight_source:
+                            # Use the weight mesh directly as Data Transfer source
+                            src = weight_mesh_mappings[0]
+                        dt_mod = asset_obj.modifiers.new("DataTransfer", 'DATA_TRANSFER')
+                        dt_mod.object = src
+                        dt_mod.use_vert_data = True
+                        dt_mod.data_types_verts = {'VGROUP_WEIGHTS'}
+                        dt_mod.vert_mapping = 'POLYINTERP_NEAREST'
+                        bpy.context.view_layer.objects.active = asset_obj
+                        bpy.ops.object.datalayout_transfer(modifier=dt_mod.name)
+                        bpy.ops.object.modifier_apply(modifier=dt_mod.name)
+                        vg_count = len(asset_obj.vertex_groups)
+                        print(f"  {name}: transferred {vg_count} bone weight groups via Data Transfer")
+
+                    # Add armature modifier
                     arm_mod = asset_obj.modifiers.new("Armature", 'ARMATURE')
-                    arm_mod.object = saved_arm_obj_nm
-
-            # Select this object (+ armature if present) for export
-            bpy.ops.object.select_all(action='DESELECT')
-            asset_obj.select_set(True)
-            if armature_object:
-                armature_object.select_set(True)
-
-            # Export as individual GLB (modifiers already applied, shape keys preserved)
-            out_path = os.path.join(output_dir, f"{name.lower()}.glb")
-            bpy.ops.export_scene.gltf(
-                filepath=out_path,
-                export_format="GLB",
-                use_selection=True,
-                export_apply=False,
-                export_morph=has_morphs,
-                export_morph_normal=False,
-                export_morph_tangent=False,
-                export_skins=armature_object is not None,
-                export_yup=True,
-            )
-
-            file_size = os.path.getsize(out_path)
-
-            # Copy texture alongside GLB for external loading
-            if tex_file and os.path.exists(tex_file):
-                import shutil
-                tex_ext = os.path.splitext(tex_file)[1]
-                tex_out = os.path.join(output_dir, f"{name.lower()}_diffuse{tex_ext}")
-                shutil.copy2(tex_file, tex_out)
-                print(f"  {name}: texture copied to {tex_out}")
-
-            # Save delete_verts info for future runtime body masking
-            if delete_verts:
-                import json as json_mod
-                meta_path = os.path.join(output_dir, f"{name.lower()}_meta.json")
-                with open(meta_path, "w") as mf:
-                    json_mod.dump({"delete_verts": sorted(delete_verts)}, mf)
-                print(f"  {name}: {len(delete_verts)} delete_verts saved to meta")
-
-            print(f"  {name}: exported {out_path} ({file_size / 1024:.0f} KB)")
-            exported.append(name)
-
-            # Remove from scene (don't pollute main GLB)
-            bpy.ops.object.select_all(action='DESELECT')
-            asset_obj.select_set(True)
-            bpy.ops.object.delete()
-
-        except Exception as e:
-            print(f"  {name}: FAILED - {e}")
-            import traceback
-            traceback.print_exc()
+                    arm_mod.object = armature_object
+
+                # Transfer morph targets from body to clothing via barycentric interpolation
+                has_morphs = False
+                if all_morph_deltas and vertex_mappings:
+                    morph_count = transfer_morphs_to_clothing(asset_obj, vertex_mappings, morph_names, body_matrix, basemesh)
+                    has_morphs = morph_count > 0
+                    print(f"  {name}: transferred {morph_count} morph targets to clothing")
+
+                # Bake subdivision into the mesh, carrying shape keys across
+                # (same helper as the body mesh). Armature modifier is re-added.
+                _saved_arm, baked = bake_subdivision_with_morphs(asset_obj, keep_empty=False)
+                if has_morphs:
+                    print(f"  {name}: baked subdivision for {baked} morphs ({len(asset_obj.data.vertices)} verts)")
+
+                # Select this object (+ armature if present) for export
+                bpy.ops.object.select_all(action='DESELECT')
+                asset_obj.select_set(True)
+                if armature_object:
+                    armature_object.select_set(True)
+
+                # Export as individual GLB (modifiers already applied, shape keys preserved)
+                out_path = os.path.join(output_dir, f"{name.lower()}.glb")
+                bpy.ops.export_scene.gltf(
+                    filepath=out_path,
+                    export_format="GLB",
+                    use_selection=True,
+                    export_apply=False,
+                    export_morph=has_morphs,
+                    export_morph_normal=False,
+                    export_morph_tangent=False,
+                    export_try_sparse_sk=True,
+                    export_skins=armature_object is not None,
+                    export_yup=True,
+                )
+
+                file_size = os.path.getsize(out_path)
+
+                # Copy texture alongside GLB for external loading
+                if tex_file:
+                    tex_ext = os.path.splitext(tex_file)[1]
+                    tex_out = os.path.join(output_dir, f"{name.lower()}_diffuse{tex_ext}")
+                    io_jobs.append((name, f"texture copied to {tex_out}",
+                                    io_pool.submit(shutil.copy2, tex_file, tex_out)))
+
+                # Save delete_verts info for future runtime body masking
+                if delete_verts:
+                    meta_path = os.path.join(output_dir, f"{name.lower()}_meta.json")
+                    io_jobs.append((name, f"{len(delete_verts)} delete_verts saved to meta",
+                                    io_pool.submit(_write_delete_verts_meta, meta_path, set(delete_verts))))
+
+                print(f"  {name}: exported {out_path} ({file_size / 1024:.0f} KB)")
+                exported.append(name)
+
+                # Remove from scene (don't pollute main GLB)
+                bpy.data.objects.remove(asset_obj, do_unlink=True)
+
+            except Exception as e:
+                print(f"  {name}: FAILED - {e}")
+                import traceback
+                traceback.print_exc()
+    finally:
+        edit_prefs.use_global_undo = saved_global_undo
+        # Wait for queued texture copies / meta writes so errors surface here
+        io_pool.shutdown(wait=True)
+
+    for name, message, future in io_jobs:
+        err = future.exception()
+        if err:
+            print(f"  {name}: FAILED background write - {err}")
+        else:
+            print(f"  {name}: {message}")
 
     # Compute safe delete_verts: INTERSECTION within each category, then UNION across categories.
     # This ensures we only delete body verts that are covered by ALL variants in a category.
@@ -1732,16 +2008,15 @@ def export_clothing_items(basemesh, all_morph_deltas=None, armature_object=None,
         if not dv_list:
             continue
         # If any variant in the category has no delete_verts, intersection is empty
-        non_empty = [s for s in dv_list if s]
+        non_empty = [a for a in dv_list if a.size > 0]
         if len(non_empty) < len(dv_list):
             print(f"  {cat_name}: some variants have no delete_verts, skipping category")
             continue
-        cat_intersection = non_empty[0]
-        for s in non_empty[1:]:
-            cat_intersection = cat_intersection & s
-        if cat_intersection:
-            print(f"  {cat_name}: {len(cat_intersection)} delete_verts (intersection of {len(dv_list)} variants)")
-            all_delete_verts.update(cat_intersection)
+        cat_intersection = functools.reduce(
+            lambda a, b: np.intersect1d(a, b, assume_unique=True), non_empty)
+        if cat_intersection.size:
+            print(f"  {cat_name}: {cat_intersection.size} delete_verts (intersection of {len(dv_list)} variants)")
+            all_delete_verts.update(cat_intersection.tolist())
 
     print(f"  Total safe delete_verts: {len(all_delete_verts)}")
     return exported, all_delete_verts
@@ -1751,52 +2026,54 @@ def postprocess_glb_alpha(glb_path):
     """Post-process GLB to change alphaMode from BLEND to MASK for eyebrow/eyelash
     materials. MASK mode with a low cutoff works more reliably in expo-three than
     BLEND mode for textures with binary-ish alpha."""
+    import mmap
     import struct
     import json as json_mod
 
-    with open(glb_path, "rb") as f:
-        data = f.read()
-
-    # Parse GLB header
-    magic, version, length = struct.unpack_from("<III", data, 0)
-    json_len = struct.unpack_from("<I", data, 12)[0]
-    json_type = struct.unpack_from("<I", data, 16)[0]
-    json_bytes = data[20:20 + json_len]
-    gltf = json_mod.loads(json_bytes.decode("utf-8"))
-
-    modified = False
-    for mat in gltf.get("materials", []):
-        if mat.get("alphaMode") == "BLEND":
-            mat["alphaMode"] = "MASK"
-            mat["alphaCutoff"] = 0.1
-            print(f"  Post-process: {mat['name']} -> MASK (cutoff=0.1)")
-            modified = True
-
-    if not modified:
-        print("  Post-process: no BLEND materials to fix")
-        return
+    # Memory-map the GLB: only the JSON chunk is copied out, and the binary
+    # chunk is written straight from the mapping.
+    tmp_path = glb_path + ".tmp"
+    with open(glb_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # Parse GLB header
+        magic, version, length = struct.unpack_from("<III", mm, 0)
+        json_len = struct.unpack_from("<I", mm, 12)[0]
+        json_type = struct.unpack_from("<I", mm, 16)[0]
+        gltf = json_mod.loads(mm[20:20 + json_len].decode("utf-8"))
+
+        modified = False
+        for mat in gltf.get("materials", []):
+            if mat.get("alphaMode") == "BLEND":
+                mat["alphaMode"] = "MASK"
+                mat["alphaCutoff"] = 0.1
+                print(f"  Post-process: {mat['name']} -> MASK (cutoff=0.1)")
+                modified = True
+
+        if not modified:
+            print("  Post-process: no BLEND materials to fix")
+            return
 
-    # Rebuild GLB with updated JSON
-    new_json = json_mod.dumps(gltf, separators=(",", ":")).encode("utf-8")
-    # Pad to 4-byte alignment with spaces
-    while len(new_json) % 4 != 0:
-        new_json += b" "
+        # Rebuild GLB with updated JSON
+        new_json = json_mod.dumps(gltf, separators=(",", ":")).encode("utf-8")
+        # Pad to 4-byte alignment with spaces
+        new_json += b" " * (-len(new_json) % 4)
 
-    # Binary chunk starts after header (12) + json chunk header (8) + json data
-    bin_offset = 20 + json_len
-    bin_chunk = data[bin_offset:]
+        # Binary chunk starts after header (12) + json chunk header (8) + json data
+        bin_offset = 20 + json_len
+        bin_len = len(mm) - bin_offset
 
-    # Rebuild GLB
-    new_length = 12 + 8 + len(new_json) + len(bin_chunk)
-    header = struct.pack("<III", magic, version, new_length)
-    json_chunk_header = struct.pack("<II", len(new_json), json_type)
+        # Rebuild GLB into a temp file, then swap it in
+        new_length = 12 + 8 + len(new_json) + bin_len
+        header = struct.pack("<III", magic, version, new_length)
+        json_chunk_header = struct.pack("<II", len(new_json), json_type)
 
-    with open(glb_path, "wb") as f:
-        f.write(header)
-        f.write(json_chunk_header)
-        f.write(new_json)
-        f.write(bin_chunk)
+        with open(tmp_path, "wb") as out:
+            out.write(header)
+            out.write(json_chunk_header)
+            out.write(new_json)
+            with memoryview(mm)[bin_offset:] as bin_chunk:
+                out.write(bin_chunk)
 
+    os.replace(tmp_path, glb_path)
     print(f"  Post-process: GLB rewritten ({new_length} bytes)")
 
 
@@ -1903,33 +2180,23 @@ def main():
     print(f"  Total delete_verts from clothing: {len(clothing_delete_verts)}")
 
     # STEP 0c: Remove MPFB2's default shape keys (they have non-zero values
-    # that distort the mesh). Must zero all values first, then remove
-    # non-Basis keys before Basis so the mesh reverts to neutral position.
+    # that distort the mesh). shape_key_clear() frees the whole key datablock
+    # at once; the mesh keeps its own vertex positions, which are the Basis,
+    # so it reverts to the neutral position.
     if basemesh.data.shape_keys:
         num_default = len(basemesh.data.shape_keys.key_blocks)
         print(f"\nStep 0: Removing {num_default} MPFB2 default shape keys...")
-        # First zero all non-Basis values so mesh display = Basis
         for sk in basemesh.data.shape_keys.key_blocks[1:]:
-            print(f"  Zeroing: {sk.name} (was {sk.value:.3f})")
-            sk.value = 0.0
-        # Remove non-Basis keys first (reverse order)
-        while len(basemesh.data.shape_keys.key_blocks) > 1:
-            sk = basemesh.data.shape_keys.key_blocks[-1]
-            basemesh.shape_key_remove(sk)
-        # Finally remove Basis — mesh vertices set from Basis data
-        basemesh.shape_key_remove(basemesh.data.shape_keys.key_blocks[0])
+            print(f"  Removing: {sk.name} (was {sk.value:.3f})")
+        basemesh.shape_key_clear()
         print(f"  All default shape keys removed, mesh at neutral position")
     else:
         print("\nStep 0: No default shape keys to remove")
 
-    # STEP 1: Build vertex index map BEFORE removing helpers
-    # Also exclude clothing-covered vertices from the map
-    print("\nStep 1: Building vertex index map...")
-    old_to_new = build_vertex_index_map(basemesh, delete_verts=clothing_delete_verts)
-
-    # STEP 2: Remove helper geometry AND clothing-covered body faces
-    print("\nStep 2: Removing helper geometry + clothing-covered faces...")
-    remove_helper_geometry(basemesh, delete_verts=clothing_delete_verts)
+    # STEP 1-2: Remove helper geometry AND clothing-covered body faces,
+    # building the vertex index map from the same pass
+    print("\nStep 1-2: Removing helper geometry + clothing-covered faces, building vertex index map...")
+    vertex_lut = remove_helpers_and_build_lut(basemesh, delete_verts=clothing_delete_verts)
 
     # STEP 3: Add a basic material
     print("\nStep 3: Adding material...")
@@ -1951,7 +2218,7 @@ def main():
         raw_name = os.path.basename(target_spec)
         sk_name = TARGET_NAME_OVERRIDES.get(raw_name, raw_name)
         try:
-            affected = load_target_with_remap(basemesh, target_path, sk_name, old_to_new)
+            affected = load_target_with_remap(basemesh, target_path, sk_name, vertex_lut)
             loaded += 1
         except Exception as e:
             print(f"  FAILED: {sk_name}: {e}")
@@ -1961,7 +2228,7 @@ def main():
     # STEP 4.5: Add breast morphs from captured depsgraph deltas
     print("\nStep 4.5: Adding breast morphs from MPFB2 parametric capture...")
     if breast_deltas:
-        breast_count = add_captured_breast_morphs(basemesh, breast_deltas, old_to_new)
+        breast_count = add_captured_breast_morphs(basemesh, breast_deltas, vertex_lut)
         loaded += breast_count
         print(f"  Added {breast_count} breast morphs from parametric capture")
     else:
@@ -1969,7 +2236,7 @@ def main():
 
     # STEP 4.6: Load symmetric targets (merge r- and l- into single shape keys)
     print("\nStep 4.6: Loading symmetric targets...")
-    sym_count = load_symmetric_targets(basemesh, target_dir, old_to_new)
+    sym_count = load_symmetric_targets(basemesh, target_dir, vertex_lut)
     loaded += sym_count
     print(f"  Loaded {sym_count} symmetric targets")
 
@@ -1985,95 +2252,19 @@ def main():
         print("Zeroed all shape key values for export")
 
     # STEP 5.5: Bake subdivided shape keys
-    # Add SubSurf, evaluate each shape key via depsgraph, replace shape key
-    # data with subdivided positions, then remove modifier.
+    # Evaluate each shape key through SubSurf, apply the modifier to the bare
+    # mesh, then rebuild the shape keys from the subdivided deltas.
     print("\nStep 5.5: Baking subdivided shape keys...")
     bpy.context.view_layer.objects.active = basemesh
     basemesh.select_set(True)
 
-    # Temporarily remove Armature modifier — vertex groups (bone weights) persist
-    # on mesh data regardless. We'll re-add it after subdivision is applied.
-    saved_armature_obj = None
-    for m in list(basemesh.modifiers):
-        if m.type == 'ARMATURE':
-            saved_armature_obj = m.object
-            basemesh.modifiers.remove(m)
-            print("  Temporarily removed Armature modifier for subdivision bake")
-            break
-
-    subsurf = basemesh.modifiers.new(name="Subdivision", type='SUBSURF')
-    subsurf.levels = 1
-    subsurf.render_levels = 1
-
-    # Zero all keys, evaluate subdivided Basis
-    for sk in basemesh.data.shape_keys.key_blocks[1:]:
-        sk.value = 0.0
-    depsgraph = bpy.context.evaluated_depsgraph_get()
-    eval_obj = basemesh.evaluated_get(depsgraph)
-    eval_mesh = eval_obj.to_mesh()
-    subdiv_vcount = len(eval_mesh.vertices)
-    print(f"  Subdivided vertex count: {subdiv_vcount}")
-
-    # Capture basis positions
-    import numpy as np
-    basis_co = np.zeros(subdiv_vcount * 3)
-    eval_mesh.vertices.foreach_get("co", basis_co)
-    eval_obj.to_mesh_clear()
-
-    # For each shape key, set value=1, evaluate, capture deltas
-    sk_data = {}
-    for sk in basemesh.data.shape_keys.key_blocks[1:]:
-        sk.value = 1.0
-        depsgraph.update()
-        eval_obj = basemesh.evaluated_get(depsgraph)
-        eval_mesh = eval_obj.to_mesh()
-        sk_co = np.zeros(subdiv_vcount * 3)
-        eval_mesh.vertices.foreach_get("co", sk_co)
-        eval_obj.to_mesh_clear()
-        sk.value = 0.0
-
-        # Compute deltas
-        deltas = sk_co - basis_co
-        nonzero = np.count_nonzero(np.abs(deltas.reshape(-1, 3)).max(axis=1) > 1e-6)
-        sk_data[sk.name] = deltas
-        print(f"  {sk.name}: {nonzero} affected vertices (subdivided)")
-
-    # Now remove modifier and all shape keys
-    basemesh.modifiers.remove(subsurf)
-
-    # Remove existing shape keys
-    while basemesh.data.shape_keys and len(basemesh.data.shape_keys.key_blocks) > 1:
-        basemesh.shape_key_remove(basemesh.data.shape_keys.key_blocks[-1])
-    if basemesh.data.shape_keys:
-        basemesh.shape_key_remove(basemesh.data.shape_keys.key_blocks[0])
-
-    # Apply subdivision to the base mesh (no shape keys now)
-    subsurf = basemesh.modifiers.new(name="Subdivision", type='SUBSURF')
-    subsurf.levels = 1
-    subsurf.render_levels = 1
-    bpy.ops.object.modifier_apply(modifier="Subdivision")
+    saved_armature_obj, baked = bake_subdivision_with_morphs(basemesh, verbose=True)
     print(f"  Applied subdivision: {len(basemesh.data.vertices)} vertices")
+    print(f"  Rebuilt {baked} shape keys on subdivided mesh")
 
-    # Re-add shape keys with subdivided data
-    basemesh.shape_key_add(name="Basis", from_mix=False)
-    for sk_name, deltas in sk_data.items():
-        sk = basemesh.shape_key_add(name=sk_name, from_mix=False)
-        deltas_reshaped = deltas.reshape(-1, 3)
-        for i in range(len(basemesh.data.vertices)):
-            if abs(deltas_reshaped[i][0]) > 1e-6 or abs(deltas_reshaped[i][1]) > 1e-6 or abs(deltas_reshaped[i][2]) > 1e-6:
-                sk.data[i].co.x = basemesh.data.vertices[i].co.x + deltas_reshaped[i][0]
-                sk.data[i].co.y = basemesh.data.vertices[i].co.y + deltas_reshaped[i][1]
-                sk.data[i].co.z = basemesh.data.vertices[i].co.z + deltas_reshaped[i][2]
-        sk.value = 0.0
-
-    print(f"  Rebuilt {len(sk_data)} shape keys on subdivided mesh")
-
-    # Re-add Armature modifier after subdivision bake
     # Note: Step 2 removes ALL modifiers (including the original Armature modifier),
     # so saved_armature_obj may be None. Use armature_object directly.
     if saved_armature_obj:
-        mod = basemesh.modifiers.new(name="Armature", type='ARMATURE')
-        mod.object = saved_armature_obj
         print("  Re-added Armature modifier after subdivision bake")
     elif armature_object:
         # Armature modifier was lost in Step 2 — re-add it now
@@ -2099,6 +2290,7 @@ def main():
         export_morph=True,
         export_morph_normal=False,
         export_morph_tangent=False,
+        export_try_sparse_sk=True,  # sparse morph accessors (see MAKEHUMAN_MORPH_TARGETS_GUIDE.md)
         export_skins=armature_object is not None,
         export_animations=False,
         export_yup=True,
@@ -2124,204 +2316,501 @@ def main():
     print("Done!")
 
 
+# Blender 4.4+ slotted actions
+ACTION_HAS_SLOTS = "slots" in bpy.types.Action.bl_rna.properties
+
+
+def _new_action_fcurves(obj, action_name):
+    """Create a new action bound to obj and return (action, fcurves).
+
+    Blender 4.4+ keeps F-Curves per action slot in a channelbag; older
+    versions expose them directly on the action.
+    """
+    action = bpy.data.actions.new(action_name)
+    anim_data = obj.animation_data_create()
+    anim_data.action = action
+    if ACTION_HAS_SLOTS:
+        from bpy_extras import anim_utils
+        slot = action.slots.new(id_type='OBJECT', name=obj.name)
+        anim_data.action_slot = slot
+        return action, anim_utils.action_ensure_channelbag_for_slot(action, slot).fcurves
+    return action, action.fcurves
+
+
+def _reuse_action_fcurves(obj, action_name):
+    """Like _new_action_fcurves(), but recycle obj's bound action if any.
+
+    The action is renamed and its F-Curves cleared, so consecutive clips
+    share one ID block.
+    """
+    anim_data = obj.animation_data
+    if not anim_data or not anim_data.action:
+        return _new_action_fcurves(obj, action_name)
+    action = anim_data.action
+    action.name = action_name
+    if ACTION_HAS_SLOTS:
+        from bpy_extras import anim_utils
+        fcurves = anim_utils.action_ensure_channelbag_for_slot(action, anim_data.action_slot).fcurves
+    else:
+        fcurves = action.fcurves
+    fcurves.clear()
+    return action, fcurves
+
+
+def _active_action_fcurves(obj):
+    """Return the F-Curves of obj's active action (slot-aware on Blender 4.4+)."""
+    anim_data = obj.animation_data
+    action = anim_data.action
+    if ACTION_HAS_SLOTS:
+        from bpy_extras import anim_utils
+        slot = anim_data.action_slot or (action.slots[0] if action.slots else None)
+        channelbag = anim_utils.action_get_channelbag_for_slot(action, slot) if slot else None
+        return list(channelbag.fcurves) if channelbag else []
+    return list(action.fcurves)
+
+
+def _rotation_channels(pose_bone, fcurves_by_key):
+    """Resolve what drives a pose bone's rotation, per component.
+
+    Returns (rotation_mode, channels): one F-Curve per component, or the
+    bone's static value for components that have no curve.
+    """
+    mode = pose_bone.rotation_mode
+    if mode == 'QUATERNION':
+        prop = "rotation_quaternion"
+    elif mode == 'AXIS_ANGLE':
+        prop = "rotation_axis_angle"
+    else:
+        prop = "rotation_euler"
+    data_path = pose_bone.path_from_id(prop)
+    static = getattr(pose_bone, prop)
+    channels = [fcurves_by_key.get((data_path, c), float(static[c])) for c in range(len(static))]
+    return mode, channels
+
+
+def _flat_fcurve_value(fc):
+    """Return the constant value of an F-Curve that cannot vary, else None.
+
+    Idle bones in mocap clips are keyed with the same value on every frame;
+    if every key and handle sits at one value and there are no modifiers,
+    the curve evaluates to that value everywhere and needs no sampling.
+    """
+    points = fc.keyframe_points
+    if fc.modifiers or not len(points):
+        return None
+    ys = np.empty(len(points) * 6, dtype=np.float32)
+    points.foreach_get("co", ys[:len(points) * 2])
+    points.foreach_get("handle_left", ys[len(points) * 2:len(points) * 4])
+    points.foreach_get("handle_right", ys[len(points) * 4:])
+    ys = ys[1::2]
+    return float(ys[0]) if np.all(ys == ys[0]) else None
+
+
+def _sample_rotation(mode, channels, frames):
+    """Sample rotation channels from _rotation_channels() at each frame.
+
+    Returns an (F, 4) array of unit wxyz quaternions.
+    """
+    vals = np.empty((len(frames), len(channels)))
+    frame_list = [float(f) for f in frames]
+    for c, ch in enumerate(channels):
+        if isinstance(ch, float):
+            vals[:, c] = ch
+            continue
+        flat = _flat_fcurve_value(ch)
+        if flat is not None:
+            vals[:, c] = flat
+        else:
+            vals[:, c] = [ch.evaluate(f) for f in frame_list]
+    if mode == 'QUATERNION':
+        norm = np.linalg.norm(vals, axis=1, keepdims=True)
+        norm[norm == 0.0] = 1.0
+        return vals / norm
+    if mode == 'AXIS_ANGLE':
+        axis = vals[:, 1:]
+        norm = np.linalg.norm(axis, axis=1, keepdims=True)
+        zero = norm[:, 0] == 0.0
+        norm[zero] = 1.0
+        half = vals[:, :1] * 0.5
+        out = np.concatenate([np.cos(half), np.sin(half) * axis / norm], axis=1)
+        out[zero] = (1.0, 0.0, 0.0, 0.0)
+        return out
+    # Euler: per-axis quaternions composed so the first axis in the order
+    # string is applied first (e.g. 'XYZ' -> qz @ qy @ qx)
+    out = None
+    for axis_char in mode:
+        a = "XYZ".index(axis_char)
+        half = vals[:, a] * 0.5
+        q_axis = np.zeros((len(frames), 4))
+        q_axis[:, 0] = np.cos(half)
+        q_axis[:, 1 + a] = np.sin(half)
+        out = q_axis if out is None else _quat_mul(q_axis, out)
+    return out
+
+
+def _quat_mul(a, b):
+    """Hamilton product of wxyz quaternion arrays shaped (..., 4)."""
+    aw, ax, ay, az = np.moveaxis(a, -1, 0)
+    bw, bx, by, bz = np.moveaxis(b, -1, 0)
+    return np.stack([
+        aw * bw - ax * bx - ay * by - az * bz,
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+    ], axis=-1)
+
+
+def _mat3_to_quat(m):
+    """Rotation part of (..., 4, 4) or (..., 3, 3) matrices as wxyz quaternions.
+
+    Columns are normalized first so scaled matrices (the FBX armature has a
+    0.1 object scale) convert like mathutils' to_quaternion(). Each matrix
+    uses whichever of the four standard extractions has the largest pivot.
+    """
+    r = m[..., :3, :3]
+    r = r / np.linalg.norm(r, axis=-2, keepdims=True)
+    m00, m01, m02 = r[..., 0, 0], r[..., 0, 1], r[..., 0, 2]
+    m10, m11, m12 = r[..., 1, 0], r[..., 1, 1], r[..., 1, 2]
+    m20, m21, m22 = r[..., 2, 0], r[..., 2, 1], r[..., 2, 2]
+    trace = m00 + m11 + m22
+    pivots = np.stack([trace, m00, m11, m22], axis=-1)
+    case = np.argmax(pivots, axis=-1)
+    s = 2.0 * np.sqrt(np.maximum(1.0 + 2.0 * np.take_along_axis(pivots, case[..., None], -1)[..., 0] - trace, 1e-12))
+    candidates = np.stack([
+        np.stack([0.25 * s, (m21 - m12) / s, (m02 - m20) / s, (m10 - m01) / s], axis=-1),
+        np.stack([(m21 - m12) / s, 0.25 * s, (m01 + m10) / s, (m02 + m20) / s], axis=-1),
+        np.stack([(m02 - m20) / s, (m01 + m10) / s, 0.25 * s, (m12 + m21) / s], axis=-1),
+        np.stack([(m10 - m01) / s, (m02 + m20) / s, (m12 + m21) / s, 0.25 * s], axis=-1),
+    ], axis=-2)
+    return np.take_along_axis(candidates, case[..., None, None], -2)[..., 0, :]
+
+
+def _bone_rest_matrices(armature_obj, names):
+    """Armature-space rest matrices of the named bones, shaped (len(names), 4, 4)."""
+    bones = armature_obj.data.bones
+    flat = np.empty(len(bones) * 16, dtype=np.float32)
+    bones.foreach_get("matrix_local", flat)
+    # RNA stores matrices column-major
+    mats = flat.reshape(-1, 4, 4).transpose(0, 2, 1).astype(np.float64)
+    return mats[[bones.find(name) for name in names]]
+
+
+def _quat_sandwich(c, q):
+    """Compute c @ q @ c^-1 for unit wxyz quaternion arrays shaped (..., 4).
+
+    Conjugating by a unit quaternion leaves w unchanged and rotates the vector
+    part: v' = v + w_c*t + c_xyz x t with t = 2*(c_xyz x v).
+    """
+    cw, cx, cy, cz = np.moveaxis(c, -1, 0)
+    qw, qx, qy, qz = np.moveaxis(q, -1, 0)
+    # Component-wise cross products; np.cross transposes its inputs internally
+    tx = 2.0 * (cy * qz - cz * qy)
+    ty = 2.0 * (cz * qx - cx * qz)
+    tz = 2.0 * (cx * qy - cy * qx)
+    out = np.empty(np.broadcast_shapes(c.shape, q.shape))
+    out[..., 0] = qw
+    out[..., 1] = qx + cw * tx + (cy * tz - cz * ty)
+    out[..., 2] = qy + cw * ty + (cz * tx - cx * tz)
+    out[..., 3] = qz + cw * tz + (cx * ty - cy * tx)
+    return out
+
+
+def compute_retarget(fbx_rest_mats, body_rest_mats, arm_world, fbx_world, fbx_q):
+    """Change-of-basis FBX bone rotations into the body's bone-local frames.
+
+    Pure NumPy with no Blender API. fbx_rest_mats and body_rest_mats are
+    (B, 4, 4) armature-space rest matrices of the matching bones, arm_world
+    and fbx_world the 4x4 object matrices, and fbx_q the (F, B, 4) wxyz FBX
+    basis rotations per frame.
+
+    Returns (body_q, aligned): the (F, B, 4) body basis rotations, and a
+    (B,) mask of bones whose correction is identity, which copy through.
+    """
+    # World-space rest rotations
+    fbx_wr = _mat3_to_quat(fbx_world @ fbx_rest_mats)
+    body_wr = _mat3_to_quat(arm_world @ body_rest_mats)
+    # Correction: rotates from FBX bone space to body bone space
+    corr = _quat_mul(body_wr, fbx_wr * np.array([1.0, -1.0, -1.0, -1.0]))
+    corr /= np.linalg.norm(corr, axis=1, keepdims=True)
+
+    aligned = (np.abs(1.0 - np.abs(corr[:, 0])) < 1e-6) & (np.linalg.norm(corr[:, 1:], axis=1) < 1e-6)
+    body_q = fbx_q.copy()
+    body_q[:, ~aligned] = _quat_sandwich(corr[None, ~aligned], fbx_q[:, ~aligned])
+    return body_q, aligned
+
+
+def _write_fcurve_keys(fcurves, data_path, frames, values):
+    """Create one F-Curve per channel of values (F, C), filled with one foreach_set."""
+    co = np.empty((len(frames), 2), dtype=np.float32)
+    co[:, 0] = frames
+    for c in range(values.shape[1]):
+        fc = fcurves.new(data_path, index=c)
+        fc.keyframe_points.add(len(frames))
+        co[:, 1] = values[:, c]
+        fc.keyframe_points.foreach_set("co", co.ravel())
+        fc.update()
+
+
+def _bones_parent_first(armature_object):
+    """Return the armature's pose bones sorted parents-first.
+
+    Depths are memoized, so each parent chain is walked once.
+    """
+    depth = {}
+    for bone in armature_object.pose.bones:
+        chain = []
+        b = bone
+        while b and b.name not in depth:
+            chain.append(b)
+            b = b.parent
+        d = depth[b.name] if b else -1
+        for x in reversed(chain):
+            d += 1
+            depth[x.name] = d
+    return sorted(armature_object.pose.bones, key=lambda b: depth[b.name])
+
+
 def export_mixamo_animations(armature_object):
     """Import Mixamo FBX animations and retarget to body armature.
 
-    Uses manual matrix-based retargeting: for each frame, reads the FBX bone's
-    world-space rotation and computes the body bone's local rotation that
-    produces the same world orientation. This avoids potential issues with
-    NLA bake + GLTF exporter interaction in Blender 5.0.
-
-    FBX armature has +90° X rotation AND 0.1 scale on the object.
-    Body armature has identity object transform.
+    Each clip is independent, so when there are several and Blender's binary
+    is known, the current scene is saved to a temporary .blend and clips are
+    exported by parallel background Blender processes via
+    export_mixamo_clip_worker(). Otherwise clips run in this process.
     """
-    from mathutils import Matrix, Quaternion
+    import subprocess
+    import tempfile
 
     anim_dir = os.path.join(os.path.dirname(OUTPUT_PATH), "animations")
     fbx_dir = os.path.join(SCRIPT_DIR, "..", "assets", "models", "animations")
     os.makedirs(anim_dir, exist_ok=True)
 
-    fbx_files = sorted([f for f in os.listdir(fbx_dir) if f.endswith('.fbx')])
-    if not fbx_files:
+    with os.scandir(fbx_dir) as entries:
+        fbx_paths = sorted(e.path for e in entries if e.name.endswith('.fbx'))
+    if not fbx_paths:
         print("  No FBX files found in animations dir")
         return
 
-    body_bone_names = set(b.name for b in armature_object.data.bones)
-
     # Set all body bones to QUATERNION rotation mode
     for pb in armature_object.pose.bones:
         pb.rotation_mode = 'QUATERNION'
 
-    # Sort body bones in hierarchy order (parents first)
-    def bone_depth(bone):
-        d = 0
-        b = bone
-        while b.parent:
-            d += 1
-            b = b.parent
-        return d
+    workers = min(ANIMATION_WORKERS, len(fbx_paths))
+    if workers <= 1 or not bpy.app.binary_path:
+        body_bones_sorted = _bones_parent_first(armature_object)
+        for fbx_path in fbx_paths:
+            export_mixamo_clip(armature_object, fbx_path, anim_dir, body_bones_sorted)
+        armature_object.animation_data_clear()
+        for a in list(bpy.data.actions):
+            bpy.data.actions.remove(a)
+        return
 
-    body_bones_sorted = sorted(armature_object.pose.bones, key=lambda b: bone_depth(b))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        blend_path = os.path.join(tmp_dir, "body.blend")
+        bpy.ops.wm.save_as_mainfile(filepath=blend_path, copy=True)
+        print(f"  Exporting {len(fbx_paths)} clips with {workers} Blender processes")
 
-    for fbx_file in fbx_files:
-        anim_name = os.path.splitext(fbx_file)[0]
-        fbx_path = os.path.join(fbx_dir, fbx_file)
-        print(f"\n  Processing: {fbx_file} -> {anim_name}.glb")
+        def run_clip(fbx_path):
+            expr = (
+                f"import sys; sys.path.insert(0, {SCRIPT_DIR!r}); "
+                f"import export_makehuman; "
+                f"export_makehuman.export_mixamo_clip_worker({armature_object.name!r}, {fbx_path!r})"
+            )
+            # Without --python-exit-code, Blender exits 0 even when the
+            # expression raises, and a failed clip would look exported
+            return subprocess.run(
+                [bpy.app.binary_path, "--background", blend_path,
+                 "--python-exit-code", "1", "--python-expr", expr],
+                capture_output=True, text=True,
+            )
 
-        # Clear existing actions
-        for a in list(bpy.data.actions):
-            bpy.data.actions.remove(a)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run_clip, fbx_paths))
 
-        # Import FBX
-        bpy.ops.import_scene.fbx(filepath=fbx_path)
+    failed = []
+    for fbx_path, result in zip(fbx_paths, results):
+        print(result.stdout.rstrip())
+        if result.returncode != 0:
+            print(f"  FAILED {os.path.basename(fbx_path)} (exit {result.returncode})")
+            print(result.stderr.rstrip())
+            failed.append(os.path.basename(fbx_path))
 
-        # Find imported armature (and delete any imported meshes)
-        fbx_armature = None
-        fbx_meshes = []
-        for obj in list(bpy.context.scene.objects):
-            if obj == armature_object:
-                continue
-            if obj.type == 'ARMATURE':
-                fbx_armature = obj
-            elif obj.type == 'MESH' and obj.parent and obj.parent.type == 'ARMATURE' and obj.parent != armature_object:
-                fbx_meshes.append(obj)
-
-        # Remove FBX meshes (we only need the armature)
-        for mesh_obj in fbx_meshes:
-            bpy.data.objects.remove(mesh_obj, do_unlink=True)
-
-        if not fbx_armature or not fbx_armature.animation_data or not fbx_armature.animation_data.action:
-            print(f"    WARNING: No animation found in {fbx_file}, skipping")
-            if fbx_armature:
-                bpy.data.objects.remove(fbx_armature, do_unlink=True)
-            continue
+    # A failing clip aborts the run, as it does when clips export in-process
+    if failed:
+        raise RuntimeError(f"Animation export failed for {len(failed)} clip(s): {', '.join(failed)}")
 
-        fbx_action = fbx_armature.animation_data.action
-        print(f"    FBX action: {fbx_action.name}")
 
-        # Set frame range
-        frame_start = int(fbx_action.frame_range[0])
-        frame_end = int(fbx_action.frame_range[1])
-        bpy.context.scene.frame_start = frame_start
-        bpy.context.scene.frame_end = frame_end
-        print(f"    Frame range: {frame_start}-{frame_end}")
+def export_mixamo_clip_worker(armature_name, fbx_path):
+    """Entry point for a background Blender process exporting one clip.
 
-        # Build set of FBX bone names
-        fbx_bone_names = set(b.name for b in fbx_armature.data.bones)
-        matching_bones = body_bone_names & fbx_bone_names
-        print(f"    Matching bones: {len(matching_bones)} / {len(body_bone_names)} body, {len(fbx_bone_names)} fbx")
+    Clips without animation are skipped with a warning, as in-process; any
+    exception makes the process exit non-zero (see --python-exit-code).
+    """
+    armature_object = bpy.data.objects[armature_name]
+    anim_dir = os.path.join(os.path.dirname(OUTPUT_PATH), "animations")
+    export_mixamo_clip(armature_object, fbx_path, anim_dir, _bones_parent_first(armature_object))
 
-        # Ensure body armature is active
-        bpy.ops.object.select_all(action='DESELECT')
-        armature_object.select_set(True)
-        bpy.context.view_layer.objects.active = armature_object
 
-        # Reset body armature to rest pose
-        armature_object.animation_data_clear()
-        for pb in armature_object.pose.bones:
-            pb.rotation_quaternion = Quaternion((1, 0, 0, 0))
-            pb.location = (0, 0, 0)
-            pb.scale = (1, 1, 1)
-        bpy.context.view_layer.update()
-
-        # Basis-correction retargeting: for each frame, read the FBX bone's
-        # matrix_basis (pose delta in FBX bone-local frame), transform it
-        # through a per-bone correction matrix into the body's bone-local
-        # frame, and apply to the body bone.
-        #
-        # The correction accounts for different bone-local coordinate systems
-        # between the FBX armature (Y-up bone axes, -90°X object rotation)
-        # and the body armature (Z-up bone axes, identity object).
-        #
-        # For each bone:
-        #   fbx_world_rest = fbx_arm.matrix_world @ fbx_bone.matrix_local
-        #   body_world_rest = body_arm.matrix_world @ body_bone.matrix_local
-        #   correction = body_world_rest @ fbx_world_rest^-1
-        #   body_basis = correction @ fbx_basis @ correction^-1
-        #
-        # This is a change-of-basis that preserves the physical joint rotation
-        # while accounting for different bone axis conventions.
-
-        # Pre-compute per-bone correction quaternions
-        corrections = {}
-        arm_world = armature_object.matrix_world
-        fbx_world = fbx_armature.matrix_world
-        for body_pb in body_bones_sorted:
-            if body_pb.name not in matching_bones:
-                continue
-            fbx_bone = fbx_armature.data.bones.get(body_pb.name)
-            body_bone = armature_object.data.bones.get(body_pb.name)
-            if not fbx_bone or not body_bone:
-                continue
-            # World-space rest rotations
-            fbx_wr = (fbx_world @ fbx_bone.matrix_local).to_quaternion()
-            body_wr = (arm_world @ body_bone.matrix_local).to_quaternion()
-            # Correction: rotates from FBX bone space to body bone space
-            corrections[body_pb.name] = body_wr @ fbx_wr.inverted()
+def export_mixamo_clip(armature_object, fbx_path, anim_dir, body_bones_sorted):
+    """Import one Mixamo FBX animation and retarget it to the body armature.
 
-        print(f"    Computed corrections for {len(corrections)} bones")
+    Uses manual matrix-based retargeting: for each frame, reads the FBX bone's
+    world-space rotation and computes the body bone's local rotation that
+    produces the same world orientation. This avoids potential issues with
+    NLA bake + GLTF exporter interaction in Blender 5.0.
 
-        for frame in range(frame_start, frame_end + 1):
-            bpy.context.scene.frame_set(frame)
+    FBX armature has +90° X rotation AND 0.1 scale on the object.
+    Body armature has identity object transform.
 
-            for body_pb in body_bones_sorted:
-                if body_pb.name not in matching_bones:
-                    continue
+    Returns True if the clip was exported.
+    """
+    fbx_file = os.path.basename(fbx_path)
+    anim_name = os.path.splitext(fbx_file)[0]
+    print(f"\n  Processing: {fbx_file} -> {anim_name}.glb")
+
+    # Clear existing actions, keeping the body's reusable retarget action
+    body_action = armature_object.animation_data.action if armature_object.animation_data else None
+    for a in list(bpy.data.actions):
+        if a != body_action:
+            bpy.data.actions.remove(a)
 
-                fbx_pb = fbx_armature.pose.bones[body_pb.name]
-                correction = corrections.get(body_pb.name)
-                if not correction:
-                    continue
+    # Import FBX
+    bpy.ops.import_scene.fbx(filepath=fbx_path)
 
-                # FBX bone's pose delta (rotation from FBX rest, in FBX bone-local frame)
-                fbx_basis = fbx_pb.matrix_basis.to_quaternion()
+    # Find imported armature (and delete any imported meshes)
+    fbx_armature = None
+    fbx_meshes = []
+    for obj in list(bpy.context.scene.objects):
+        if obj == armature_object:
+            continue
+        if obj.type == 'ARMATURE':
+            fbx_armature = obj
+        elif obj.type == 'MESH' and obj.parent and obj.parent.type == 'ARMATURE' and obj.parent != armature_object:
+            fbx_meshes.append(obj)
+
+    # Remove FBX meshes (we only need the armature)
+    for mesh_obj in fbx_meshes:
+        bpy.data.objects.remove(mesh_obj, do_unlink=True)
+
+    if not fbx_armature or not fbx_armature.animation_data or not fbx_armature.animation_data.action:
+        print(f"    WARNING: No animation found in {fbx_file}, skipping")
+        if fbx_armature:
+            bpy.data.objects.remove(fbx_armature, do_unlink=True)
+        return False
+
+    fbx_action = fbx_armature.animation_data.action
+    print(f"    FBX action: {fbx_action.name}")
+
+    # Set frame range
+    frame_start = int(fbx_action.frame_range[0])
+    frame_end = int(fbx_action.frame_range[1])
+    bpy.context.scene.frame_start = frame_start
+    bpy.context.scene.frame_end = frame_end
+    print(f"    Frame range: {frame_start}-{frame_end}")
+
+    # Build sets of body and FBX bone names
+    body_bone_names = set(b.name for b in armature_object.data.bones)
+    fbx_bone_names = set(b.name for b in fbx_armature.data.bones)
+    matching_bones = body_bone_names & fbx_bone_names
+    print(f"    Matching bones: {len(matching_bones)} / {len(body_bone_names)} body, {len(fbx_bone_names)} fbx")
 
-                # Transform to body bone-local frame via change-of-basis
-                correction_inv = correction.inverted()
-                body_basis = correction @ fbx_basis @ correction_inv
+    # Make the body armature the only selected object, and the active one
+    for obj in bpy.context.selected_objects:
+        obj.select_set(False)
+    armature_object.select_set(True)
+    bpy.context.view_layer.objects.active = armature_object
+
+    # Keyframe rotations only. The action (and its slot on Blender 5.0,
+    # which the GLTF exporter requires) is reused from the previous clip
+    # when there is one, with its F-Curves emptied.
+    act, fcurves = _reuse_action_fcurves(armature_object, anim_name)
+
+    # Reset body armature to rest pose
+    body_pose_bones = armature_object.pose.bones
+    num_pose_bones = len(body_pose_bones)
+    body_pose_bones.foreach_set(
+        "rotation_quaternion", np.tile(np.array([1, 0, 0, 0], dtype=np.float32), num_pose_bones))
+    body_pose_bones.foreach_set("location", np.zeros(num_pose_bones * 3, dtype=np.float32))
+    body_pose_bones.foreach_set("scale", np.ones(num_pose_bones * 3, dtype=np.float32))
+
+    # Basis-correction retargeting: for each frame, read the FBX bone's
+    # matrix_basis (pose delta in FBX bone-local frame), transform it
+    # through a per-bone correction matrix into the body's bone-local
+    # frame, and apply to the body bone.
+    #
+    # The correction accounts for different bone-local coordinate systems
+    # between the FBX armature (Y-up bone axes, -90°X object rotation)
+    # and the body armature (Z-up bone axes, identity object).
+    #
+    # For each bone:
+    #   fbx_world_rest = fbx_arm.matrix_world @ fbx_bone.matrix_local
+    #   body_world_rest = body_arm.matrix_world @ body_bone.matrix_local
+    #   correction = body_world_rest @ fbx_world_rest^-1
+    #   body_basis = correction @ fbx_basis @ correction^-1
+    #
+    # This is a change-of-basis that preserves the physical joint rotation
+    # while accounting for different bone axis conventions.
+
+    # Flat work list of (body pose bone, FBX pose bone) pairs, parents
+    # first. Only reading rest matrices and F-Curves and writing keys touch
+    # Blender; the retarget itself is compute_retarget() on plain arrays.
+    work = [(body_pb, fbx_armature.pose.bones[body_pb.name])
+            for body_pb in body_bones_sorted if body_pb.name in matching_bones]
+    names = [body_pb.name for body_pb, _fbx_pb in work]
+    fbx_rest_mats = _bone_rest_matrices(fbx_armature, names)
+    body_rest_mats = _bone_rest_matrices(armature_object, names)
+
+    frames = np.arange(frame_start, frame_end + 1, dtype=np.float32)
+
+    # Sample the FBX rotation F-Curves directly: matrix_basis is just these
+    # channels, so no per-frame scene evaluation is needed.
+    fbx_fcurves = {(fc.data_path, fc.array_index): fc
+                   for fc in _active_action_fcurves(fbx_armature)}
+    fbx_q = np.empty((len(frames), len(work), 4))
+    for bi, (_body_pb, fbx_pb) in enumerate(work):
+        channels = _rotation_channels(fbx_pb, fbx_fcurves)
+        fbx_q[:, bi] = _sample_rotation(*channels, frames)
+
+    body_q, aligned = compute_retarget(
+        fbx_rest_mats, body_rest_mats,
+        np.array(armature_object.matrix_world), np.array(fbx_armature.matrix_world),
+        fbx_q,
+    )
+    print(f"    Identity corrections: {int(aligned.sum())} / {len(work)} bones")
 
-                body_pb.rotation_quaternion = body_basis
+    for bi, (body_pb, _fbx_pb) in enumerate(work):
+        data_path = body_pb.path_from_id("rotation_quaternion")
+        _write_fcurve_keys(fcurves, data_path, frames, body_q[:, bi])
+    print(f"    Baked action: {act.name}")
 
-            # Keyframe rotations only
-            for body_pb in body_bones_sorted:
-                if body_pb.name not in matching_bones:
-                    continue
-                body_pb.keyframe_insert(data_path="rotation_quaternion", frame=frame)
-
-        # Ensure action slot is set for Blender 5.0 GLTF exporter
-        if armature_object.animation_data and armature_object.animation_data.action:
-            act = armature_object.animation_data.action
-            if hasattr(act, 'slots') and act.slots:
-                armature_object.animation_data.action_slot = act.slots[0]
-            print(f"    Baked action: {act.name}")
-
-        print(f"    Retargeted {len(matching_bones)} bones over {frame_end - frame_start + 1} frames")
-
-        # Delete FBX armature
-        bpy.data.objects.remove(fbx_armature, do_unlink=True)
-
-        # Export
-        out_path = os.path.join(anim_dir, f"{anim_name}.glb")
-        bpy.ops.export_scene.gltf(
-            filepath=out_path,
-            export_format="GLB",
-            use_selection=True,
-            export_animations=True,
-            export_skins=False,
-            export_morph=False,
-            export_yup=True,
-            export_force_sampling=True,
-            export_optimize_animation_size=True,
-            export_optimize_animation_keep_anim_armature=False,
-        )
+    print(f"    Retargeted {len(matching_bones)} bones over {frame_end - frame_start + 1} frames")
 
-        file_size = os.path.getsize(out_path)
-        print(f"    Exported: {out_path} ({file_size / 1024:.0f} KB)")
+    # Delete FBX armature
+    bpy.data.objects.remove(fbx_armature, do_unlink=True)
 
-        # Clean up action from body armature
-        armature_object.animation_data_clear()
-        for a in list(bpy.data.actions):
+    # Export
+    out_path = os.path.join(anim_dir, f"{anim_name}.glb")
+    bpy.ops.export_scene.gltf(
+        filepath=out_path,
+        export_format="GLB",
+        use_selection=True,
+        export_animations=True,
+        export_skins=False,
+        export_morph=False,
+        export_yup=True,
+        export_force_sampling=True,
+        export_optimize_animation_size=True,
+        export_optimize_animation_keep_anim_armature=False,
+    )
+
+    file_size = os.path.getsize(out_path)
+    print(f"    Exported: {out_path} ({file_size / 1024:.0f} KB)")
+
+    # Drop the orphaned FBX action; the body action is reused next clip
+    for a in list(bpy.data.actions):
+        if a != act:
             bpy.data.actions.remove(a)
+    return True
 
 
 if __name__ == "__main__":
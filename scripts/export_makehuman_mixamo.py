@@ -18,6 +18,8 @@ import bmesh
 import os
 import sys
 
+import numpy as np
+
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
 MIXAMO_FBX = os.path.join(PROJECT_DIR, "assets", "models", "mixamo_rigged.fbx")
@@ -41,6 +43,8 @@ from export_makehuman import (
     collect_all_morph_deltas,
     export_clothing_items,
     postprocess_glb_alpha,
+    read_group_weights,
+    bake_subdivision_with_morphs,
 )
 
 # Enable MPFB2 addon (needed for basemesh creation + morph loading)
@@ -51,10 +55,11 @@ from bl_ext.blender_org.mpfb.services.humanservice import HumanService
 
 def build_vertex_index_map_from_mpfb2():
     """Create a temporary MPFB2 basemesh just to get the vertex index mapping.
-    Returns (old_to_new, weight_old_to_new) where:
-    - old_to_new: maps body vertex indices to sequential new indices (for morph targets)
-    - weight_old_to_new: maps ALL vertex indices (including helpers) to nearest body
-      vertex's new index (for bone weight transfer via mhclo mappings)
+    Returns (vertex_lut, weight_lut), int32 arrays indexed by original vertex:
+    - vertex_lut: body vertex -> sequential new index, -1 for helpers (for morph targets)
+    - weight_lut: ALL vertices (including helpers) -> nearest body vertex's new
+      index (for bone weight transfer via mhclo mappings)
+    Both are None if the mesh has no 'body' vertex group.
     """
     from mathutils.kdtree import KDTree
 
@@ -71,27 +76,20 @@ def build_vertex_index_map_from_mpfb2():
     if not vg:
         print("  WARNING: No 'body' vertex group")
         bpy.data.objects.remove(temp_mesh, do_unlink=True)
-        return {}, {}
-
-    vg_idx = vg.index
-    old_to_new = {}
-    body_verts = []  # (original_index, coordinate) for KDTree
-    new_idx = 0
-    for v in temp_mesh.data.vertices:
-        in_body = False
-        for g in v.groups:
-            if g.group == vg_idx and g.weight > 0.5:
-                in_body = True
-                break
-        if in_body:
-            old_to_new[v.index] = new_idx
-            body_verts.append((v.index, v.co.copy()))
-            new_idx += 1
-
-    print(f"  Vertex map: {len(old_to_new)} body vertices out of {len(temp_mesh.data.vertices)} total")
-
-    # Build weight_old_to_new: includes helper vertices mapped to nearest body vertex
-    weight_old_to_new = dict(old_to_new)  # start with body mappings
+        return None, None
+
+    num_orig = len(temp_mesh.data.vertices)
+    body_idx = np.flatnonzero(read_group_weights(temp_mesh.data, vg.index) >= 0.5)
+    # (original_index, coordinate) for KDTree
+    body_verts = [(i, temp_mesh.data.vertices[i].co.copy()) for i in body_idx.tolist()]
+
+    vertex_lut = np.full(num_orig, -1, dtype=np.int32)
+    vertex_lut[[orig_idx for orig_idx, _co in body_verts]] = np.arange(len(body_verts), dtype=np.int32)
+
+    print(f"  Vertex map: {len(body_verts)} body vertices out of {num_orig} total")
+
+    # Build weight_lut: includes helper vertices mapped to nearest body vertex
+    weight_lut = vertex_lut.copy()  # start with body mappings
     helper_count = 0
 
     if body_verts:
@@ -101,17 +99,17 @@ def build_vertex_index_map_from_mpfb2():
         kd.balance()
 
         for v in temp_mesh.data.vertices:
-            if v.index not in old_to_new:
+            if vertex_lut[v.index] < 0:
                 _co, nearest_orig_idx, _dist = kd.find(v.co)
-                weight_old_to_new[v.index] = old_to_new[nearest_orig_idx]
+                weight_lut[v.index] = vertex_lut[nearest_orig_idx]
                 helper_count += 1
 
-    print(f"  Weight map: {len(weight_old_to_new)} total ({helper_count} helpers mapped to nearest body vert)")
+    print(f"  Weight map: {int(np.count_nonzero(weight_lut >= 0))} total ({helper_count} helpers mapped to nearest body vert)")
 
     # Clean up temp mesh
     bpy.data.objects.remove(temp_mesh, do_unlink=True)
 
-    return old_to_new, weight_old_to_new
+    return vertex_lut, weight_lut
 
 
 def main():
@@ -171,13 +169,13 @@ def main():
 
     # STEP 2: Build vertex index mapping from a temporary MPFB2 mesh
     print("\nStep 2: Building vertex index mapping...")
-    old_to_new, weight_old_to_new = build_vertex_index_map_from_mpfb2()
-    if not old_to_new:
+    vertex_lut, weight_lut = build_vertex_index_map_from_mpfb2()
+    if vertex_lut is None or vertex_lut.max() < 0:
         print("ERROR: Failed to build vertex index map")
         return
 
     # Verify vertex count matches
-    expected_body_verts = max(old_to_new.values()) + 1
+    expected_body_verts = int(vertex_lut.max()) + 1
     actual_verts = len(mixamo_mesh.data.vertices)
     print(f"  Expected body vertices: {expected_body_verts}")
     print(f"  Mixamo mesh vertices: {actual_verts}")
@@ -223,7 +221,7 @@ def main():
     # Export clothing with exact bone weight transfer via mhclo mappings
     clothing_exported, clothing_delete_verts = export_clothing_items(
         temp_basemesh3, all_morph_deltas, mixamo_armature,
-        weight_mesh_mappings=(mixamo_mesh, weight_old_to_new),
+        weight_mesh_mappings=(mixamo_mesh, weight_lut),
     )
     print(f"  Exported {len(clothing_exported)} clothing items: {', '.join(clothing_exported)}")
 
@@ -266,7 +264,7 @@ def main():
             head_vg.add(all_vert_indices, 1.0, 'REPLACE')
             print(f"    {asset_obj.name}: {len(all_vert_indices)} verts -> mixamorig:Head")
 
-    # STEP 4: Add morph targets to body (AFTER face removal, using reduced old_to_new)
+    # STEP 4: Add morph targets to body (AFTER face removal, using reduced vertex_lut)
     print("\nStep 4: Loading morph targets...")
     bpy.context.view_layer.objects.active = mixamo_mesh
     mixamo_mesh.select_set(True)
@@ -280,7 +278,7 @@ def main():
         raw_name = os.path.basename(target_spec)
         sk_name = TARGET_NAME_OVERRIDES.get(raw_name, raw_name)
         try:
-            affected = load_target_with_remap(mixamo_mesh, target_path, sk_name, old_to_new)
+            affected = load_target_with_remap(mixamo_mesh, target_path, sk_name, vertex_lut)
             loaded += 1
         except Exception as e:
             print(f"  FAILED: {sk_name}: {e}")
@@ -289,12 +287,12 @@ def main():
 
     # Add breast morphs
     if breast_deltas:
-        breast_count = add_captured_breast_morphs(mixamo_mesh, breast_deltas, old_to_new)
+        breast_count = add_captured_breast_morphs(mixamo_mesh, breast_deltas, vertex_lut)
         loaded += breast_count
         print(f"  Added {breast_count} breast morphs")
 
     # Add symmetric targets
-    sym_count = load_symmetric_targets(mixamo_mesh, target_dir, old_to_new)
+    sym_count = load_symmetric_targets(mixamo_mesh, target_dir, vertex_lut)
     loaded += sym_count
     print(f"  Added {sym_count} symmetric targets")
 
@@ -311,82 +309,12 @@ def main():
     bpy.context.view_layer.objects.active = mixamo_mesh
     mixamo_mesh.select_set(True)
 
-    # Temporarily remove Armature modifier
-    saved_armature_obj = None
-    for m in list(mixamo_mesh.modifiers):
-        if m.type == 'ARMATURE':
-            saved_armature_obj = m.object
-            mixamo_mesh.modifiers.remove(m)
-            print("  Temporarily removed Armature modifier")
-            break
-
-    import numpy as np
-
-    subsurf = mixamo_mesh.modifiers.new(name="Subdivision", type='SUBSURF')
-    subsurf.levels = 1
-    subsurf.render_levels = 1
-
-    # Zero all keys, evaluate subdivided Basis
-    for sk in mixamo_mesh.data.shape_keys.key_blocks[1:]:
-        sk.value = 0.0
-    depsgraph = bpy.context.evaluated_depsgraph_get()
-    eval_obj = mixamo_mesh.evaluated_get(depsgraph)
-    eval_mesh = eval_obj.to_mesh()
-    subdiv_vcount = len(eval_mesh.vertices)
-    print(f"  Subdivided vertex count: {subdiv_vcount}")
-
-    basis_co = np.zeros(subdiv_vcount * 3)
-    eval_mesh.vertices.foreach_get("co", basis_co)
-    eval_obj.to_mesh_clear()
-
-    # Capture each shape key
-    sk_data = {}
-    for sk in mixamo_mesh.data.shape_keys.key_blocks[1:]:
-        sk.value = 1.0
-        depsgraph.update()
-        eval_obj = mixamo_mesh.evaluated_get(depsgraph)
-        eval_mesh = eval_obj.to_mesh()
-        sk_co = np.zeros(subdiv_vcount * 3)
-        eval_mesh.vertices.foreach_get("co", sk_co)
-        eval_obj.to_mesh_clear()
-        sk.value = 0.0
-
-        deltas = sk_co - basis_co
-        nonzero = np.count_nonzero(np.abs(deltas.reshape(-1, 3)).max(axis=1) > 1e-6)
-        sk_data[sk.name] = deltas
-        print(f"  {sk.name}: {nonzero} affected vertices (subdivided)")
-
-    # Remove modifier and all shape keys
-    mixamo_mesh.modifiers.remove(subsurf)
-    while mixamo_mesh.data.shape_keys and len(mixamo_mesh.data.shape_keys.key_blocks) > 1:
-        mixamo_mesh.shape_key_remove(mixamo_mesh.data.shape_keys.key_blocks[-1])
-    if mixamo_mesh.data.shape_keys:
-        mixamo_mesh.shape_key_remove(mixamo_mesh.data.shape_keys.key_blocks[0])
-
-    # Apply subdivision
-    subsurf = mixamo_mesh.modifiers.new(name="Subdivision", type='SUBSURF')
-    subsurf.levels = 1
-    subsurf.render_levels = 1
-    bpy.ops.object.modifier_apply(modifier="Subdivision")
+    saved_armature_obj, baked = bake_subdivision_with_morphs(mixamo_mesh, verbose=True)
     print(f"  Applied subdivision: {len(mixamo_mesh.data.vertices)} vertices")
-
-    # Re-add shape keys with subdivided data
-    mixamo_mesh.shape_key_add(name="Basis", from_mix=False)
-    for sk_name, deltas in sk_data.items():
-        sk = mixamo_mesh.shape_key_add(name=sk_name, from_mix=False)
-        deltas_reshaped = deltas.reshape(-1, 3)
-        for i in range(len(mixamo_mesh.data.vertices)):
-            if abs(deltas_reshaped[i][0]) > 1e-6 or abs(deltas_reshaped[i][1]) > 1e-6 or abs(deltas_reshaped[i][2]) > 1e-6:
-                sk.data[i].co.x = mixamo_mesh.data.vertices[i].co.x + deltas_reshaped[i][0]
-                sk.data[i].co.y = mixamo_mesh.data.vertices[i].co.y + deltas_reshaped[i][1]
-                sk.data[i].co.z = mixamo_mesh.data.vertices[i].co.z + deltas_reshaped[i][2]
-        sk.value = 0.0
-    print(f"  Rebuilt {len(sk_data)} shape keys on subdivided mesh")
+    print(f"  Rebuilt {baked} shape keys on subdivided mesh")
 
     # Re-add Armature modifier
     if saved_armature_obj:
-        mod = mixamo_mesh.modifiers.new(name="Armature", type='ARMATURE')
-        mod.object = saved_armature_obj
         print("  Re-added Armature modifier")
     elif mixamo_armature:
         mod = mixamo_mesh.modifiers.new(name="Armature", type='ARMATURE')
@@ -413,6 +341,7 @@ def main():
         export_morph=True,
         export_morph_normal=False,
         export_morph_tangent=False,
+        export_try_sparse_sk=True,
         export_skins=True,
         export_animations=False,
         export_yup=True,